@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+OBJECT_CACHE_PREFIX = 'object'
+TIMEOUT_SETTINGS = {}
+
+
+def get_object_key(model, pk):
+    return f'{OBJECT_CACHE_PREFIX}:{model._meta.label_lower}:{pk}'
+
+
+def get_timeout(model):
+    name = TIMEOUT_SETTINGS.get(model, 'OBJECT_CACHE_TIMEOUT')
+    return getattr(settings, name)
+
+
+def get_many(model, ids):
+    """Объекты модели по списку pk в порядке ids.
+
+    Все ключи читаются одним обращением к кэшу, промахи — одним запросом
+    к БД. Отсутствующие в БД pk пропускаются.
+    """
+    ids = list(ids)
+    keys = {pk: get_object_key(model, pk) for pk in ids}
+    found = cache.get_many(keys.values())
+    objects = {pk: found[key] for pk, key in keys.items() if key in found}
+    missing = [pk for pk in keys if pk not in objects]
+    if missing:
+        loaded = model._default_manager.in_bulk(missing)
+        cache.set_many(
+            {get_object_key(model, pk): obj for pk, obj in loaded.items()},
+            get_timeout(model),
+        )
+        objects.update(loaded)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def get(model, pk):
+    objects = get_many(model, [pk])
+    return objects[0] if objects else None
+
+
+def invalidate(model, *ids):
+    cache.delete_many([get_object_key(model, pk) for pk in ids])
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    invalidate(sender, instance.pk)
+
+
+def register(model, timeout_setting=None):
+    """Сбрасывает кэш объекта при сохранении и удалении через ORM.
+
+    QuerySet.update() сигналов не отправляет, после него нужно вызвать
+    invalidate() явно. timeout_setting задает имя настройки со временем
+    жизни записей модели вместо OBJECT_CACHE_TIMEOUT.
+    """
+    if timeout_setting is not None:
+        TIMEOUT_SETTINGS[model] = timeout_setting
+    uid = f'object_cache:{model._meta.label_lower}'
+    post_save.connect(invalidate_instance, sender=model, dispatch_uid=uid)
+    post_delete.connect(invalidate_instance, sender=model, dispatch_uid=uid)
@@ -0,0 +1,124 @@
+import hashlib
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_response_headers
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from . import metrics
+from .uploadhandlers import StreamingImageUploadHandler
+
+PAGE_CACHE_PREFIX = 'page'
+
+
+def get_page_key(key_prefix, request):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{key_prefix}:{url}'
+
+
+def get_jittered_timeout(timeout, jitter):
+    return timeout * random.uniform(1 - jitter, 1 + jitter)
+
+
+def is_cacheable(request):
+    return (request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated)
+
+
+def is_storable(response):
+    return (response.status_code == 200
+            and not response.streaming
+            and not response.cookies)
+
+
+def cache_response(timeout, key_prefix, stale_timeout=None, jitter=0.1):
+    """Кэширует страницу для гостей, как cache_page, но без лавины промахов.
+
+    Копия считается свежей timeout секунд с разбросом ±jitter, чтобы
+    страницы не истекали одновременно, и хранится еще stale_timeout секунд.
+    Пересчитывает страницу только запрос, взявший блокировку через
+    cache.add; остальные в это время получают устаревшую копию, а при ее
+    отсутствии ждут результат до PAGE_CACHE_LOCK_WAIT секунд.
+    """
+    if stale_timeout is None:
+        stale_timeout = settings.PAGE_CACHE_STALE_TIMEOUT
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+            key = get_page_key(key_prefix, request)
+            response, locked = get_cached_response(key)
+            if response is not None:
+                return response
+            metrics.incr('page_cache.misses')
+            try:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response = response.render()
+                if is_storable(response):
+                    store_response(key, response, timeout,
+                                   stale_timeout, jitter)
+            finally:
+                if locked:
+                    cache.delete(get_lock_key(key))
+            return response
+        return wrapper
+    return decorator
+
+
+def accept_image_uploads(view):
+    """Принимает файлы запроса через StreamingImageUploadHandler.
+
+    Обработчики загрузки нельзя менять после чтения request.POST, а
+    CsrfViewMiddleware читает его раньше представления, поэтому проверка
+    CSRF переносится внутрь декоратора, после замены обработчиков.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [StreamingImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def get_lock_key(key):
+    return f'{key}:lock'
+
+
+def get_cached_response(key):
+    """Возвращает копию страницы и признак того, что взята блокировка."""
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.time():
+        metrics.incr('page_cache.hits')
+        return entry[1], False
+    if cache.add(get_lock_key(key), True, settings.PAGE_CACHE_LOCK_TIMEOUT):
+        return None, True
+    if entry is not None:
+        metrics.incr('page_cache.stale_hits')
+        return entry[1], False
+    metrics.incr('page_cache.lock_waits')
+    entry = wait_for_entry(key)
+    return (entry[1] if entry is not None else None), False
+
+
+def store_response(key, response, timeout, stale_timeout, jitter):
+    patch_response_headers(response, timeout)
+    fresh_until = time.time() + get_jittered_timeout(timeout, jitter)
+    cache.set(key, (fresh_until, response), timeout + stale_timeout)
+
+
+def wait_for_entry(key):
+    deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(settings.PAGE_CACHE_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
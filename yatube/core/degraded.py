@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .decorators import get_page_key
+
+LAST_GOOD_PREFIX = 'last_good'
+STALE_BANNER = (
+    '<div class="container">'
+    '<div class="alert alert-warning mt-3" role="alert">'
+    'Сайт перегружен: страница показана из кэша и может быть устаревшей.'
+    '</div></div>'
+)
+
+
+def read_state():
+    try:
+        with open(settings.DEGRADED_STATE_FILE) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_state(state, exclusive=False):
+    """Записывает состояние атомарно через временный файл.
+
+    С exclusive файл создается, только если его еще нет; возвращает,
+    удалось ли записать.
+    """
+    path = settings.DEGRADED_STATE_FILE
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(state, file)
+        if not exclusive:
+            os.replace(temp_path, path)
+            return True
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            return False
+        return True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def get_state():
+    """Состояние режима или None, если сайт работает в обычном режиме.
+
+    Состояние хранится в файле DEGRADED_STATE_FILE, поэтому его видят все
+    процессы сайта и команда degraded_mode. Истекшее автоматическое
+    включение снимается здесь же.
+    """
+    state = read_state()
+    if state is None:
+        return None
+    if state['until'] is not None and state['until'] < time.time():
+        leave()
+        return None
+    return state
+
+
+def is_active():
+    return get_state() is not None
+
+
+def enter(duration=None, reason=''):
+    """Включает режим только для чтения.
+
+    С duration режим выключится сам через столько секунд; повторные ошибки
+    продлевают его. Без duration режим держится до вызова leave().
+    """
+    until = None if duration is None else time.time() + duration
+    state = {'until': until, 'reason': reason}
+    if write_state(state, exclusive=True):
+        metrics.incr('degraded.enter')
+        return
+    current = read_state()
+    if current is None or current['until'] is not None:
+        write_state(state)
+
+
+def leave():
+    try:
+        os.remove(settings.DEGRADED_STATE_FILE)
+    except FileNotFoundError:
+        return
+    metrics.incr('degraded.leave')
+
+
+def get_last_good_key(request):
+    return get_page_key(LAST_GOOD_PREFIX, request)
+
+
+def store_last_good(request, response):
+    """Запоминает удачный ответ не чаще раза в DEGRADED_REFRESH_INTERVAL."""
+    key = get_last_good_key(request)
+    if cache.add(f'{key}:fresh', True, settings.DEGRADED_REFRESH_INTERVAL):
+        cache.set(key, response, settings.DEGRADED_CACHE_TIMEOUT)
+
+
+def get_stale_response(request):
+    """Последний удачный ответ с пометкой об устаревании или None."""
+    response = cache.get(get_last_good_key(request))
+    if response is None:
+        return None
+    metrics.incr('degraded.stale_hits')
+    if 'text/html' in response.get('Content-Type', ''):
+        response.content = response.content.replace(
+            b'<main>', b'<main>' + STALE_BANNER.encode(), 1
+        )
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = len(response.content)
+    response['Warning'] = '110 - "Response is Stale"'
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,115 @@
+import os
+import re
+from http import HTTPStatus
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def get_etag(stat):
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(header, size):
+    """Возвращает границы запрошенного диапазона (start, end) включительно.
+
+    None означает, что диапазон не задан или не поддерживается и отдается
+    весь файл. ValueError - диапазон невыполним.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError('Пустой диапазон')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Диапазон за пределами файла')
+    return start, end
+
+
+def range_allowed(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, content_type, cache_control=None,
+               offload_header=None):
+    """Отдает файл с поддержкой ETag, Last-Modified и Range.
+
+    Полный файл отдается через FileResponse, поэтому сервер приложений
+    с wsgi.file_wrapper передает его через os.sendfile. offload_header -
+    пара (заголовок, значение) вроде X-Accel-Redirect: тогда тело и
+    диапазоны отдает фронтенд-сервер.
+    """
+    stat = os.stat(path)
+    etag = get_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified)
+    if response is None and offload_header is not None:
+        response = HttpResponse(content_type=content_type)
+        header, value = offload_header
+        response[header] = value
+    if response is None:
+        response = build_file_response(request, path, stat.st_size,
+                                       content_type, etag, last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
+
+
+def build_file_response(request, path, size, content_type,
+                        etag, last_modified):
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if header and range_allowed(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(
+                status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            )
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            read_range(path, start, length),
+            status=HTTPStatus.PARTIAL_CONTENT,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import degraded, metrics
+
+METRICS = (
+    'degraded.enter',
+    'degraded.leave',
+    'degraded.errors',
+    'degraded.stale_hits',
+    'degraded.rejected_writes',
+)
+
+
+class Command(BaseCommand):
+    help = ('Включает и выключает режим только для чтения и показывает '
+            'его состояние и счетчики')
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('on', 'off', 'status'))
+        parser.add_argument(
+            '--duration',
+            type=int,
+            help='Для on: выключить режим через N секунд. Без параметра '
+                 'режим держится до off.',
+        )
+
+    def handle(self, *args, **options):
+        if options['action'] == 'on':
+            degraded.enter(options['duration'], reason='manual')
+        elif options['action'] == 'off':
+            degraded.leave()
+        state = degraded.get_state()
+        if state is None:
+            self.stdout.write('Режим только для чтения выключен')
+        elif state['until'] is None:
+            self.stdout.write(self.style.WARNING(
+                'Режим только для чтения включен до команды off'
+            ))
+        else:
+            left = round(state['until'] - time.time())
+            self.stdout.write(self.style.WARNING(
+                f'Режим только для чтения включен еще на {left} с: '
+                f'{state["reason"]}'
+            ))
+        for name, value in metrics.get_metrics(*METRICS).items():
+            self.stdout.write(f'{name}: {value}')
@@ -0,0 +1,57 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = {
+    'development': {'YATUBE_DEBUG': '1'},
+    'production': {'YATUBE_DEBUG': '0'},
+}
+TARGETS = {
+    'check': [sys.executable, 'manage.py', 'check'],
+    'wsgi': [sys.executable, '-c', 'import yatube.wsgi'],
+}
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время запуска manage.py check и импорта WSGI-приложения '
+            'в профилях development и production')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument(
+            '--profile',
+            choices=sorted(PROFILES),
+            action='append',
+            help='Профиль настроек, по умолчанию оба',
+        )
+
+    def measure(self, command, env):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+        elapsed = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(result.stderr.decode(errors='replace'))
+        return elapsed
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"профиль":<14}{"цель":<8}{"мин, мс":>10}'
+                          f'{"медиана, мс":>14}{"макс, мс":>10}')
+        for profile in options['profile'] or sorted(PROFILES):
+            env = dict(os.environ, **PROFILES[profile])
+            env.setdefault('YATUBE_SECRET_KEY', settings.SECRET_KEY)
+            for target, command in TARGETS.items():
+                timings = [self.measure(command, env)
+                           for _ in range(options['runs'])]
+                self.stdout.write(
+                    f'{profile:<14}{target:<8}'
+                    f'{min(timings) * 1000:>10.0f}'
+                    f'{statistics.median(timings) * 1000:>14.0f}'
+                    f'{max(timings) * 1000:>10.0f}'
+                )
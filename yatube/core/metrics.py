@@ -0,0 +1,64 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+METRICS_PREFIX = 'metrics'
+
+pending = Counter()
+lock = threading.Lock()
+last_flush = time.monotonic()
+
+
+def get_cache():
+    """Кэш METRICS_CACHE, общий для всех процессов сайта и команд."""
+    return caches[settings.METRICS_CACHE]
+
+
+def get_key(name):
+    return f'{METRICS_PREFIX}:{name}'
+
+
+def incr(name, delta=1):
+    """Копит приращение счетчика в памяти процесса.
+
+    В кэш приращения уходят одной пачкой не чаще раза в
+    METRICS_FLUSH_INTERVAL секунд, поэтому горячие пути вроде попаданий
+    в кэш страниц не пишут в METRICS_CACHE на каждый запрос.
+    """
+    global last_flush
+    with lock:
+        pending[name] += delta
+        now = time.monotonic()
+        if now - last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        last_flush = now
+    flush()
+
+
+def flush():
+    """Переносит накопленные приращения в кэш METRICS_CACHE."""
+    with lock:
+        values = dict(pending)
+        pending.clear()
+    cache = get_cache()
+    for name, delta in values.items():
+        key = get_key(name)
+        if cache.add(key, delta, timeout=None):
+            continue
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+
+
+def get_metrics(*names):
+    flush()
+    values = get_cache().get_many([get_key(name) for name in names])
+    return {name: values.get(get_key(name), 0) for name in names}
+
+
+atexit.register(flush)
@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model, load_backend)
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.crypto import constant_time_compare
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from . import cache, degraded, metrics
+from .decorators import is_cacheable, is_storable
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+LOCK_ERRORS = ('locked', 'busy')
+
+
+def get_user(request):
+    """Аналог django.contrib.auth.get_user с кэшем объектов пользователей.
+
+    Хеш сессии по-прежнему сверяется с паролем, поэтому смена пароля
+    разлогинивает другие сессии, как и без кэша.
+    """
+    try:
+        user_id = get_user_model()._meta.pk.to_python(
+            request.session[SESSION_KEY]
+        )
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    user = cache.get(get_user_model(), user_id)
+    backend = load_backend(backend_path)
+    can_authenticate = getattr(backend, 'user_can_authenticate', None)
+    if user is None or (can_authenticate and not can_authenticate(user)):
+        return AnonymousUser()
+    user.backend = backend_path
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+def get_cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, который берет пользователя из кэша."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+def get_view_name(request):
+    return getattr(request.resolver_match, 'view_name', None)
+
+
+def is_read_view(request):
+    return get_view_name(request) in settings.DEGRADED_READ_VIEWS
+
+
+def is_write_request(request):
+    return (request.method not in SAFE_METHODS
+            or get_view_name(request) in settings.DEGRADED_WRITE_VIEWS)
+
+
+def get_retry_response():
+    retry_after = settings.DEGRADED_RETRY_AFTER
+    response = HttpResponse(
+        render_to_string('core/degraded.html', {'retry_after': retry_after}),
+        status=503,
+    )
+    response['Retry-After'] = retry_after
+    response.is_degraded = True
+    return response
+
+
+def is_lock_error(exception):
+    """Ошибка перегрузки БД, а не, например, отсутствующей таблицы."""
+    message = str(exception)
+    return (isinstance(exception, OperationalError)
+            and any(error in message for error in LOCK_ERRORS))
+
+
+def get_stale_response(request):
+    """Сохраненная копия для гостевого GET-запроса или None."""
+    if not is_cacheable(request):
+        return None
+    response = degraded.get_stale_response(request)
+    if response is not None:
+        response.is_degraded = True
+    return response
+
+
+class DegradedModeMiddleware(MiddlewareMixin):
+    """Режим только для чтения, когда БД не справляется с нагрузкой.
+
+    Удачные гостевые ответы страниц из DEGRADED_READ_VIEWS сохраняются в
+    кэш. Ошибка OperationalError с блокировкой БД (locked, busy) включает
+    режим на DEGRADED_DURATION секунд: гостям страницы чтения отдаются из
+    этих копий с пометкой об устаревании, не обращаясь к БД, а
+    авторизованные запросы к ним и запросы на запись получают 503 с
+    Retry-After. Запись по GET (подписка и отписка) отклоняется так же.
+    Прочие ошибки БД пробрасываются дальше.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not degraded.is_active():
+            return None
+        if is_write_request(request):
+            metrics.incr('degraded.rejected_writes')
+            return get_retry_response()
+        if is_read_view(request):
+            if not is_cacheable(request):
+                return get_retry_response()
+            return get_stale_response(request)
+        return None
+
+    def process_exception(self, request, exception):
+        if not is_lock_error(exception):
+            return None
+        metrics.incr('degraded.errors')
+        degraded.enter(settings.DEGRADED_DURATION, str(exception))
+        response = None
+        if is_read_view(request):
+            response = get_stale_response(request)
+        return response or get_retry_response()
+
+    def process_response(self, request, response):
+        if (response.status_code == 200
+                and not getattr(response, 'is_degraded', False)
+                and request.method == 'GET'
+                and is_read_view(request)
+                and is_storable(response)
+                and is_cacheable(request)):
+            degraded.store_last_good(request, response)
+        return response
@@ -0,0 +1,5 @@
+from django.contrib.auth import get_user_model
+
+from . import cache
+
+cache.register(get_user_model(), 'USER_CACHE_TIMEOUT')
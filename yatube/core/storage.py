@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.map', '.xml',
+)
+MIN_COMPRESS_SIZE = 256
+
+
+def compress_gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хэшем в именах и сжатыми копиями файлов.
+
+    Для каждого сжимаемого файла рядом сохраняются копии .gz и .br
+    (если установлен пакет brotli), когда они меньше оригинала.
+    """
+
+    def get_compressors(self):
+        compressors = [('.gz', compress_gzip)]
+        if brotli is not None:
+            compressors.append(('.br', compress_brotli))
+        return compressors
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compressor in self.get_compressors():
+            compressed = compressor(content)
+            if len(compressed) >= len(content):
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            stat = os.stat(path)
+            os.utime(path + suffix, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, которое сохраняет файлы под хэшем их содержимого.
+
+    Одинаковые файлы получают одно имя и хранятся в одном экземпляре.
+    Файлы не удаляются вместе с объектами: неиспользуемые удаляет команда
+    cleanup_media.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def get_content_hash(self, content):
+        content_hash = getattr(content, 'content_hash', None)
+        if content_hash:
+            return content_hash
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def get_hashed_name(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        content_hash = self.get_content_hash(content)
+        return os.path.join(directory, content_hash[:2],
+                            content_hash + extension)
+
+    def _save(self, name, content):
+        name = self.get_hashed_name(name, content)
+        if self.exists(name):
+            try:
+                # Свежее время изменения выводит файл из окна cleanup_media,
+                # даже если до этого он долго лежал без ссылок.
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass
+        temp_name = super()._save(
+            super().get_available_name(f'{name}.tmp'), content
+        )
+        os.replace(self.path(temp_name), self.path(name))
+        return name
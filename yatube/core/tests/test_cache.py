@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ObjectCacheTests(TestCase):
+    def setUp(self):
+        default_cache.clear()
+        self.author = User.objects.create_user(username='cached-author')
+        self.group = Group.objects.create(title='Группа', slug='cached',
+                                          description='Описание')
+        self.posts = [
+            Post.objects.create(author=self.author, group=self.group,
+                                text=f'Пост {number}')
+            for number in range(5)
+        ]
+
+    def test_get_many_keeps_order_and_reads_db_once(self):
+        """Промахи читаются одним запросом, попадания — без запросов."""
+        ids = [post.pk for post in reversed(self.posts)]
+        with self.assertNumQueries(1):
+            posts = cache.get_many(Post, ids + [0])
+        self.assertEqual([post.pk for post in posts], ids)
+        with self.assertNumQueries(0):
+            cache.get_many(Post, ids)
+
+    def test_save_invalidates_object(self):
+        """Сохранение через ORM сбрасывает закэшированный объект."""
+        post = self.posts[0]
+        cache.get(Post, post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(cache.get(Post, post.pk).text, 'Новый текст')
+
+    def test_feed_fetches_only_ids(self):
+        """Прогретая лента группы делает запросы только за группой и pk."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        client = Client()
+        client.get(url)
+        with self.assertNumQueries(2):
+            response = client.get(url)
+        self.assertEqual(response.context['page_obj'][0].author, self.author)
+
+    @override_settings(USER_CACHE_TIMEOUT=300, OBJECT_CACHE_TIMEOUT=3600)
+    def test_users_use_short_timeout(self):
+        """Пользователи кэшируются на USER_CACHE_TIMEOUT, посты дольше."""
+        with mock.patch.object(default_cache, 'set_many') as set_many:
+            cache.get(User, self.author.pk)
+            cache.get(Post, self.posts[0].pk)
+        self.assertEqual([call.args[1] for call in set_many.call_args_list],
+                         [300, 3600])
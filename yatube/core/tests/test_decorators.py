@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import metrics
+from core.decorators import cache_response, get_page_key
+
+User = get_user_model()
+
+
+class CacheResponseTests(TestCase):
+    def setUp(self):
+        metrics.flush()
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+
+        @cache_response(10, key_prefix='test', stale_timeout=60, jitter=0)
+        def view(request):
+            self.calls += 1
+            return HttpResponse(f'render {self.calls}')
+
+        self.view = view
+
+    def get(self, user=None):
+        request = self.factory.get('/page/')
+        request.user = user or AnonymousUser()
+        return self.view(request)
+
+    def expire(self):
+        key = get_page_key('test', self.factory.get('/page/'))
+        _, response = cache.get(key)
+        cache.set(key, (0, response))
+        return key
+
+    def test_fresh_copy_is_reused(self):
+        """Свежая копия отдается без повторного рендера."""
+        self.assertEqual(self.get().content, b'render 1')
+        self.assertEqual(self.get().content, b'render 1')
+        self.assertEqual(metrics.get_metrics('page_cache.hits'),
+                         {'page_cache.hits': 1})
+
+    def test_hits_are_buffered_in_process(self):
+        """Попадание в кэш не пишет счетчик в кэш метрик сразу."""
+        self.get()
+        self.get()
+        self.assertIsNone(cache.get(metrics.get_key('page_cache.hits')))
+        self.assertEqual(metrics.get_metrics('page_cache.hits'),
+                         {'page_cache.hits': 1})
+
+    def test_stale_copy_is_served_while_locked(self):
+        """Пока другой запрос пересчитывает страницу, отдается старая копия."""
+        self.get()
+        key = self.expire()
+        cache.add(f'{key}:lock', True)
+        self.assertEqual(self.get().content, b'render 1')
+        self.assertEqual(self.calls, 1)
+        cache.delete(f'{key}:lock')
+        self.assertEqual(self.get().content, b'render 2')
+        self.assertEqual(metrics.get_metrics('page_cache.stale_hits'),
+                         {'page_cache.stale_hits': 1})
+
+    @override_settings(PAGE_CACHE_LOCK_WAIT=0.2)
+    def test_miss_waits_for_lock_holder(self):
+        """Без копии запрос ждет результата вместо повторного рендера."""
+        key = get_page_key('test', self.factory.get('/page/'))
+        cache.add(f'{key}:lock', True)
+        cached = HttpResponse('from lock holder')
+        with mock.patch('core.decorators.cache.get',
+                        side_effect=[None, (float('inf'), cached)]):
+            response = self.get()
+        self.assertEqual(response.content, b'from lock holder')
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(metrics.get_metrics('page_cache.lock_waits'),
+                         {'page_cache.lock_waits': 1})
+
+    def test_authenticated_users_bypass_cache(self):
+        """Страницы авторизованных пользователей не кэшируются."""
+        user = User(username='page-user')
+        self.get(user)
+        self.get(user)
+        self.assertEqual(self.calls, 2)
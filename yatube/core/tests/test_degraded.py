@@ -0,0 +1,151 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import degraded, metrics
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LOCKED = OperationalError('database is locked')
+TEMP_STATE_DIR = tempfile.mkdtemp()
+TEMP_STATE_FILE = os.path.join(TEMP_STATE_DIR, 'degraded.json')
+
+
+@override_settings(DEGRADED_STATE_FILE=TEMP_STATE_FILE)
+class DegradedModeTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATE_DIR, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Группа', slug='degraded', description='Описание'
+        )
+        Post.objects.create(author=cls.user, group=cls.group,
+                            text='Сохраненный пост')
+
+    def setUp(self):
+        metrics.flush()
+        cache.clear()
+        if os.path.exists(TEMP_STATE_FILE):
+            os.remove(TEMP_STATE_FILE)
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(DegradedModeTests.user)
+        self.url = reverse('posts:group_list',
+                           kwargs={'slug': DegradedModeTests.group.slug})
+
+    def test_stale_copy_is_served_on_lock_error(self):
+        """Ошибка блокировки включает режим и отдает последнюю копию."""
+        self.guest_client.get(self.url)
+        with mock.patch('posts.views.get_page_obj', side_effect=LOCKED):
+            response = self.guest_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Сохраненный пост')
+        self.assertContains(response, 'может быть устаревшей')
+        self.assertEqual(response['Warning'], '110 - "Response is Stale"')
+        self.assertTrue(degraded.is_active())
+        self.assertEqual(metrics.get_metrics('degraded.enter'),
+                         {'degraded.enter': 1})
+
+    def test_copy_is_served_without_database(self):
+        """Во время режима страницы чтения не обращаются к БД."""
+        self.guest_client.get(self.url)
+        degraded.enter(30)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Сохраненный пост')
+
+    def test_other_database_errors_are_raised(self):
+        """Ошибка БД без блокировки не включает режим."""
+        error = OperationalError('no such table: posts_post')
+        with mock.patch('posts.views.get_page_obj', side_effect=error):
+            with self.assertRaises(OperationalError):
+                self.guest_client.get(self.url)
+        self.assertFalse(degraded.is_active())
+
+    def test_authenticated_reader_gets_retry_later(self):
+        """Авторизованному читателю гостевая копия не отдается."""
+        self.guest_client.get(self.url)
+        degraded.enter(30)
+        response = self.authorized_client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertNotContains(response, 'Сохраненный пост', status_code=503)
+
+    def test_missing_copy_returns_retry_later(self):
+        """Без сохраненной копии отдается 503 с Retry-After."""
+        with mock.patch('posts.views.get_page_obj', side_effect=LOCKED):
+            response = self.guest_client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_writes_are_rejected(self):
+        """Запись во время режима получает 503 и ничего не сохраняет."""
+        degraded.enter(30)
+        response = self.authorized_client.post(reverse('posts:post_create'),
+                                               {'text': 'Новый пост'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_mode_expires(self):
+        """Автоматически включенный режим выключается по времени."""
+        degraded.enter(-1)
+        self.assertFalse(degraded.is_active())
+        self.assertEqual(metrics.get_metrics('degraded.leave'),
+                         {'degraded.leave': 1})
+
+    def test_switch_command(self):
+        """Команда включает режим до выключения вручную."""
+        out = StringIO()
+        call_command('degraded_mode', 'on', stdout=out)
+        self.assertTrue(degraded.is_active())
+        self.assertIn('до команды off', out.getvalue())
+        call_command('degraded_mode', 'off', stdout=out)
+        self.assertFalse(degraded.is_active())
+        self.assertIn('degraded.leave: 1', out.getvalue())
+
+    def test_get_writes_are_rejected(self):
+        """Подписка по GET во время режима получает 503."""
+        author = User.objects.create_user(username='followed')
+        degraded.enter(30)
+        response = self.authorized_client.get(
+            reverse('posts:profile_follow',
+                    kwargs={'username': author.username})
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(author.following.exists())
+
+    def test_state_is_shared_between_processes(self):
+        """Режим, включенный здесь, видит команда в другом процессе."""
+        degraded.enter(reason='manual')
+        env = dict(os.environ,
+                   YATUBE_DEGRADED_STATE_FILE=TEMP_STATE_FILE,
+                   YATUBE_METRICS_DIR=TEMP_STATE_DIR)
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'degraded_mode', 'off'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertFalse(degraded.is_active())
+        shared_metrics = FileBasedCache(TEMP_STATE_DIR, {})
+        self.assertEqual(
+            shared_metrics.get(metrics.get_key('degraded.leave')), 1
+        )
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = b'0123456789' * 10
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('posts/image.gif', 'cache/ab/cd/thumb.gif'):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_media_headers(self):
+        """Миниатюры кэшируются дольше оригиналов."""
+        expected_cache_control = {
+            '/media/posts/image.gif': settings.MEDIA_CACHE_CONTROL,
+            '/media/cache/ab/cd/thumb.gif':
+                settings.MEDIA_THUMBNAIL_CACHE_CONTROL,
+        }
+        for url, cache_control in expected_cache_control.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(response['Cache-Control'], cache_control)
+                self.assertEqual(response['Content-Type'], 'image/gif')
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_media_range(self):
+        """Запрос диапазона возвращает часть файла."""
+        response = self.guest_client.get('/media/posts/image.gif',
+                                         HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-5:])
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect')
+    def test_media_offload(self):
+        """Отдача файла передается фронтенд-серверу."""
+        response = self.guest_client.get('/media/posts/image.gif')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/posts/image.gif')
+        self.assertEqual(response.content, b'')
+
+    def test_media_not_found(self):
+        response = self.guest_client.get('/media/posts/missing.gif')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
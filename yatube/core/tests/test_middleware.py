@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+DEFAULT_MIDDLEWARE = [
+    'django.contrib.auth.middleware.AuthenticationMiddleware'
+    if name == 'core.middleware.CachedAuthenticationMiddleware' else name
+    for name in settings.MIDDLEWARE
+]
+
+
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached-user',
+                                             password='old-password')
+
+    def count_queries(self):
+        """Запросы к БД на повторный запрос авторизованного пользователя."""
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('about:author')
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        return len(queries)
+
+    def test_session_and_user_are_cached(self):
+        """Кэш сессии и пользователя экономит два запроса на каждый запрос."""
+        with override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            MIDDLEWARE=DEFAULT_MIDDLEWARE,
+        ):
+            default_queries = self.count_queries()
+        cached_queries = self.count_queries()
+        self.assertEqual(default_queries, 2)
+        self.assertEqual(cached_queries, 0)
+
+    def test_password_change_invalidates_sessions(self):
+        """После смены пароля закэшированный пользователь не используется."""
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('about:author')
+        client.get(url)
+        self.user.set_password('new-password')
+        self.user.save()
+        response = client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+PRINT_SETTINGS = (
+    'import json; from django.conf import settings; '
+    'print(json.dumps({'
+    '"debug": settings.DEBUG, '
+    '"apps": settings.INSTALLED_APPS, '
+    '"middleware": settings.MIDDLEWARE, '
+    '"templates": settings.TEMPLATES[0]["OPTIONS"], '
+    '"conn_max_age": settings.DATABASES["default"]["CONN_MAX_AGE"]}))'
+)
+
+
+def load_settings(**env):
+    environ = {name: value for name, value in os.environ.items()
+               if not name.startswith('YATUBE_')}
+    environ.update(env, DJANGO_SETTINGS_MODULE='yatube.settings')
+    return subprocess.run([sys.executable, '-c', PRINT_SETTINGS],
+                          cwd=settings.BASE_DIR, env=environ,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_development_profile(self):
+        """По умолчанию включены отладка и debug toolbar."""
+        result = load_settings()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        values = json.loads(result.stdout)
+        self.assertTrue(values['debug'])
+        self.assertIn('debug_toolbar', values['apps'])
+        self.assertEqual(values['conn_max_age'], 0)
+
+    def test_production_profile(self):
+        """С YATUBE_DEBUG=0 отладочные приложения отключены."""
+        result = load_settings(YATUBE_DEBUG='0', YATUBE_SECRET_KEY='secret')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        values = json.loads(result.stdout)
+        self.assertFalse(values['debug'])
+        self.assertNotIn('debug_toolbar', values['apps'])
+        self.assertNotIn('debug_toolbar.middleware.DebugToolbarMiddleware',
+                         values['middleware'])
+        self.assertNotIn('django.template.context_processors.debug',
+                         values['templates']['context_processors'])
+        self.assertEqual(values['templates']['loaders'][0][0],
+                         'django.template.loaders.cached.Loader')
+        self.assertEqual(values['conn_max_age'], 600)
+
+    def test_production_requires_secret_key(self):
+        """Без YATUBE_SECRET_KEY production-профиль не запускается."""
+        result = load_settings(YATUBE_DEBUG='0')
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn(b'ImproperlyConfigured', result.stderr)
+
+
+class StartupBenchmarkTests(SimpleTestCase):
+    def test_command_reports_both_targets(self):
+        """startup_benchmark выводит замеры check и wsgi."""
+        out = StringIO()
+        call_command('startup_benchmark', runs=1, profile=['production'],
+                     stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('production    check'))
+        self.assertTrue(lines[2].startswith('production    wsgi'))
@@ -0,0 +1,61 @@
+import gzip
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.views import serve_static
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = b'body { color: red; }\n' * 50
+HASHED_NAME = 'style.0123456789ab.css'
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class ServeStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        path = os.path.join(TEMP_STATIC_ROOT, HASHED_NAME)
+        with open(path, 'wb') as file:
+            file.write(CONTENT)
+        with open(path + '.gz', 'wb') as file:
+            file.write(gzip.compress(CONTENT))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_encoding_negotiation(self):
+        """Сжатая копия отдается клиенту, который ее принимает."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+        response = serve_static(request, HASHED_NAME)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(b''.join(response)), CONTENT)
+        response = serve_static(self.factory.get('/'), HASHED_NAME)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response), CONTENT)
+
+    def test_range_and_etag(self):
+        """Поддерживаются запросы диапазонов и условные запросы."""
+        request = self.factory.get('/', HTTP_RANGE='bytes=5-9')
+        response = serve_static(request, HASHED_NAME)
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response), CONTENT[5:10])
+        self.assertEqual(response['Content-Range'],
+                         f'bytes 5-9/{len(CONTENT)}')
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        response = serve_static(request, HASHED_NAME)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        request = self.factory.get('/', HTTP_RANGE='bytes=100000-')
+        response = serve_static(request, HASHED_NAME)
+        self.assertEqual(response.status_code,
+                         HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
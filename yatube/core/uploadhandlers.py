@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            TemporaryUploadedFile)
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+    b'BM',
+)
+
+
+def is_image_header(head):
+    if head.startswith(IMAGE_SIGNATURES):
+        return True
+    return head[:4] == b'RIFF' and head[8:12] == b'WEBP'
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """Принимает картинки потоком, не держа в памяти больше
+    FILE_UPLOAD_MAX_MEMORY_SIZE.
+
+    Запросы больше UPLOAD_MAX_REQUEST_SIZE и файлы, заголовок которых не
+    похож на картинку, отбрасываются до записи на диск, причина сохраняется
+    в request.upload_error. Пока файл принимается, считается его SHA-256:
+    он сохраняется в атрибуте content_hash и используется хранилищем
+    ContentAddressedStorage.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        self.request_length = content_length
+        self.in_memory = (
+            content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        self.started = time.monotonic()
+        self.received = 0
+
+    def reject(self, message, metric):
+        self.request.upload_error = message
+        metrics.incr(f'uploads.{metric}')
+        self.file.close()
+        raise SkipFile()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = BytesIO()
+        if self.request_length > settings.UPLOAD_MAX_REQUEST_SIZE:
+            self.reject(
+                'Размер загрузки не должен превышать '
+                f'{filesizeformat(settings.UPLOAD_MAX_REQUEST_SIZE)}.',
+                'rejected_size'
+            )
+        self.head = b''
+        self.sniffed = False
+        self.hasher = hashlib.sha256()
+        if not self.in_memory:
+            self.file = TemporaryUploadedFile(self.file_name,
+                                              self.content_type, 0,
+                                              self.charset,
+                                              self.content_type_extra)
+
+    def sniff(self):
+        self.sniffed = True
+        if not is_image_header(self.head):
+            self.reject(
+                'Загрузите правильное изображение. Файл, который вы '
+                'загрузили, поврежден или не является изображением.',
+                'rejected_type'
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_REQUEST_SIZE:
+            self.reject(
+                'Размер загрузки не должен превышать '
+                f'{filesizeformat(settings.UPLOAD_MAX_REQUEST_SIZE)}.',
+                'rejected_size'
+            )
+        if not self.sniffed:
+            self.head += raw_data[:settings.UPLOAD_SNIFF_SIZE]
+            if len(self.head) >= settings.UPLOAD_SNIFF_SIZE:
+                self.sniff()
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.sniffed:
+            try:
+                self.sniff()
+            except SkipFile:
+                return None
+        self.file.seek(0)
+        if self.in_memory:
+            upload = InMemoryUploadedFile(
+                file=self.file,
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=file_size,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra
+            )
+        else:
+            upload = self.file
+            upload.size = file_size
+        upload.content_hash = self.hasher.hexdigest()
+        return upload
+
+    def upload_complete(self):
+        elapsed = time.monotonic() - self.started
+        if not self.received:
+            return
+        throughput = self.received / elapsed if elapsed else 0
+        self.request.upload_metrics = {
+            'bytes': self.received,
+            'seconds': elapsed,
+            'bytes_per_second': throughput,
+        }
+        metrics.incr('uploads.count')
+        metrics.incr('uploads.bytes', self.received)
+        metrics.incr('uploads.milliseconds', int(elapsed * 1000))
+        logger.info('Upload of %d bytes took %.3f s (%.1f KiB/s), pid %d',
+                    self.received, elapsed, throughput / 1024, os.getpid())
@@ -1,6 +1,23 @@
+import mimetypes
+import os
+import re
 from http import HTTPStatus
 
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlquote
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from .files import serve_file
+
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+STATIC_ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
 
 
 def page_not_found(request, exception):
@@ -14,7 +31,72 @@ def permission_denied(request, exception):
     return render(request, 'core/403.html', status=HTTPStatus.FORBIDDEN)
 
 
+def csrf_failure(request, reason=''):
+    return render(request, 'core/403csrf.html', status=HTTPStatus.FORBIDDEN)
+
+
 def server_error(request):
     return render(request,
                   'core/500.html',
                   status=HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+def get_accepted_encodings(request):
+    encodings = set()
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def serve_static(request, path):
+    fullpath = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(fullpath)
+    served_path, encoding = fullpath, None
+    accepted = get_accepted_encodings(request)
+    for name, suffix in STATIC_ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + suffix):
+            served_path, encoding = fullpath + suffix, name
+            break
+    if HASHED_NAME_RE.search(path):
+        cache_control = settings.STATIC_IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = settings.STATIC_CACHE_CONTROL
+    response = serve_file(request, served_path,
+                          content_type or 'application/octet-stream',
+                          cache_control=cache_control)
+    if encoding and response.status_code in (HTTPStatus.OK,
+                                             HTTPStatus.PARTIAL_CONTENT):
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def get_media_offload_header(path, fullpath):
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == 'x-accel-redirect':
+        return ('X-Accel-Redirect',
+                urlquote(settings.MEDIA_ACCEL_REDIRECT_PREFIX + path))
+    if backend == 'x-sendfile':
+        return ('X-Sendfile', fullpath)
+    return None
+
+
+def serve_media(request, path):
+    fullpath = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(fullpath)
+    if path.startswith(thumbnail_settings.THUMBNAIL_PREFIX):
+        cache_control = settings.MEDIA_THUMBNAIL_CACHE_CONTROL
+    else:
+        cache_control = settings.MEDIA_CACHE_CONTROL
+    return serve_file(request, fullpath,
+                      content_type or 'application/octet-stream',
+                      cache_control=cache_control,
+                      offload_header=get_media_offload_header(path, fullpath))
@@ -1,21 +1,82 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import ValidationError
 
-from .models import Group, Post, Follow
+from . import moderation
+from .deletion import delete_group, delete_user
+from .models import Group, Post, Follow, User
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.filter(is_deleted=False),
+        required=False,
+        label='Группа',
+        help_text='Для переноса; пустое значение убирает посты из групп',
+    )
+
+
+class SoftDeleteAdminMixin:
+    """Удаление только действием soft_delete.
+
+    Стандартное удаление стирает строки сразу и в обход очереди
+    purge_deleted, поэтому оно отключено.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
         'pub_date',
         'author',
         'group',
+        'is_hidden',
+        'is_deleted',
     )
-    list_editable = ('group',)
-    list_filter = ('pub_date',)
-    search_fields = ('text',)
+    list_filter = ('pub_date', 'group', 'is_hidden', 'is_deleted')
+    search_fields = ('text', 'author__username')
     empty_value_display = '-пусто-'
+    action_form = PostActionForm
+    actions = ('move_to_group', 'hide', 'show', 'soft_delete')
+
+    def report(self, request, updated):
+        self.message_user(request, f'Обработано постов: {updated}')
+
+    def move_to_group(self, request, queryset):
+        try:
+            group = self.action_form.base_fields['group'].clean(
+                request.POST.get('group')
+            )
+        except ValidationError:
+            self.message_user(request, 'Выберите существующую группу.',
+                              messages.ERROR)
+            return
+        self.report(request, moderation.move_posts(queryset, group))
+    move_to_group.short_description = 'Перенести в выбранную группу'
+
+    def hide(self, request, queryset):
+        self.report(request, moderation.hide_posts(queryset))
+    hide.short_description = 'Скрыть'
+
+    def show(self, request, queryset):
+        self.report(request, moderation.show_posts(queryset))
+    show.short_description = 'Показать'
+
+    def soft_delete(self, request, queryset):
+        self.report(request, moderation.delete_posts(queryset))
+    soft_delete.short_description = 'Удалить в фоне'
 
 
 @admin.register(Follow)
@@ -24,4 +85,26 @@ class FollowAdmin(admin.ModelAdmin):
     search_fields = ('user',)
 
 
-admin.site.register(Group)
+@admin.register(Group)
+class GroupAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'slug', 'is_deleted')
+    list_filter = ('is_deleted',)
+    actions = ('soft_delete',)
+
+    def soft_delete(self, request, queryset):
+        for group in queryset:
+            delete_group(group)
+    soft_delete.short_description = 'Удалить в фоне'
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class DeletableUserAdmin(SoftDeleteAdminMixin, UserAdmin):
+    actions = ('soft_delete',)
+
+    def soft_delete(self, request, queryset):
+        for user in queryset:
+            delete_user(user)
+    soft_delete.short_description = 'Удалить в фоне'
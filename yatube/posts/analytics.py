@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (AuthorDailyStats, Comment, Follow, GroupDailyStats,
+                     Post, RollupWatermark)
+
+BATCH_SIZE = 1000
+
+POST_TARGETS = (
+    (GroupDailyStats, 'group_id', 'group_id', 'posts'),
+    (AuthorDailyStats, 'author_id', 'author_id', 'posts'),
+)
+
+
+def get_posts():
+    """Посты, опубликованные сразу; отложенные учитывает count_published."""
+    return Post.objects.visible().filter(publish_at__isnull=True)
+
+
+# Источник: функция с выборкой строк, поле даты и список (таблица сводки,
+# поле ключа в сводке, путь к ключу в источнике, счетчик).
+ROLLUPS = {
+    'posts': (get_posts, 'pub_date', POST_TARGETS),
+    'comments': (Comment.objects.all, 'created', (
+        (GroupDailyStats, 'group_id', 'post__group_id', 'comments'),
+        (AuthorDailyStats, 'author_id', 'post__author_id', 'comments'),
+    )),
+    'follows': (Follow.objects.all, 'created', (
+        (AuthorDailyStats, 'author_id', 'author_id', 'followers'),
+    )),
+}
+
+
+def add_counts(stats_model, key_field, counter, rows):
+    for key, date, count in rows:
+        lookup = {key_field: key, 'date': date}
+        updated = (stats_model.objects.filter(**lookup)
+                   .update(**{counter: F(counter) + count}))
+        if not updated:
+            stats_model.objects.create(**lookup, **{counter: count})
+
+
+def add_rows(rows, targets):
+    """Добавляет в сводки строки rows с аннотацией day одним GROUP BY."""
+    for stats_model, key_field, source, counter in targets:
+        add_counts(stats_model, key_field, counter, (
+            rows.filter(**{f'{source}__isnull': False})
+            .order_by()
+            .values_list(source, 'day')
+            .annotate(count=Count('pk'))
+        ))
+
+
+def count_published(ids):
+    """Учитывает только что опубликованные отложенные посты ids.
+
+    Вызывается в транзакции publish_due_posts после UPDATE, поэтому пост
+    попадает в сводку один раз и в день публикации, а не написания.
+    """
+    add_rows(Post.objects.visible().filter(pk__in=ids)
+             .annotate(day=TruncDate('pub_date')), POST_TARGETS)
+
+
+def roll_up(name, batch_size=BATCH_SIZE):
+    """Добавляет в сводки строки источника name, появившиеся после метки.
+
+    Пачка строк агрегируется одним GROUP BY по диапазону pk, а счетчики
+    и метка обновляются в одной транзакции, поэтому каждая строка
+    учитывается ровно один раз. Строки без даты, например подписки,
+    созданные до появления Follow.created, пропускаются. Посты берутся из
+    Post.objects.visible(): скрытые, удаленные и еще не опубликованные на
+    момент подсчета посты метка проходит, и в сводку они уже не попадут.
+    Отложенные посты метка тоже проходит: их учитывает count_published.
+    Возвращает число просмотренных строк.
+    """
+    get_source, date_field, targets = ROLLUPS[name]
+    model = get_source().model
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark, _ = (RollupWatermark.objects.select_for_update()
+                            .get_or_create(name=name))
+            ids = list(model.objects.filter(pk__gt=watermark.last_id)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return processed
+            rows = (get_source()
+                    .filter(pk__gt=watermark.last_id, pk__lte=ids[-1],
+                            **{f'{date_field}__isnull': False})
+                    .annotate(day=TruncDate(date_field)))
+            add_rows(rows, targets)
+            watermark.last_id = ids[-1]
+            watermark.save(update_fields=('last_id', 'updated'))
+        processed += len(ids)
+
+
+def update_rollups(batch_size=BATCH_SIZE):
+    return {name: roll_up(name, batch_size) for name in ROLLUPS}
+
+
+def get_period_start(days):
+    return timezone.localdate() - timedelta(days=days - 1)
+
+
+def get_top_groups(days, limit):
+    return (GroupDailyStats.objects
+            .filter(date__gte=get_period_start(days))
+            .values('group__title', 'group__slug')
+            .annotate(posts_sum=Sum('posts'), comments_sum=Sum('comments'))
+            .order_by('-posts_sum', '-comments_sum')[:limit])
+
+
+def get_top_authors(days, limit):
+    return (AuthorDailyStats.objects
+            .filter(date__gte=get_period_start(days))
+            .values('author__username')
+            .annotate(posts_sum=Sum('posts'), comments_sum=Sum('comments'),
+                      followers_sum=Sum('followers'))
+            .order_by('-posts_sum', '-comments_sum')[:limit])
+
+
+def get_daily_stats(stats, days):
+    return stats.filter(date__gte=get_period_start(days)).order_by('-date')
@@ -0,0 +1,143 @@
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Group, Post, User
+
+ARCHIVE_TEMPLATE = 'posts/archive.html'
+KEY_PATTERNS = {
+    'group': re.compile(r'[-a-zA-Z0-9_]+'),
+    'profile': re.compile(r'[\w.@+-]+'),
+}
+
+
+def is_valid_key(kind, key):
+    """Slug или имя пользователя, которые безопасно подставлять в путь."""
+    pattern = KEY_PATTERNS.get(kind)
+    return (pattern is not None and key not in ('.', '..')
+            and pattern.fullmatch(key) is not None)
+
+
+def get_last_finished_month():
+    today = timezone.now()
+    if today.month == 1:
+        return today.year - 1, 12
+    return today.year, today.month - 1
+
+
+def is_valid_page(kind, key, year, month):
+    """Адрес страницы архива допустим: безопасный ключ и завершенный месяц.
+
+    Месяцы без постов, в том числе раньше первого поста, отсекает
+    get_archive_context.
+    """
+    return (is_valid_key(kind, key) and 1 <= month <= 12
+            and (1, 1) <= (year, month) <= get_last_finished_month())
+
+
+def get_period(year, month):
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    if month == 12:
+        end = start.replace(year=year + 1, month=1)
+    else:
+        end = start.replace(month=month + 1)
+    return start, end
+
+
+def is_frozen(year, month):
+    _, end = get_period(year, month)
+    freeze_period = timedelta(days=settings.ARCHIVE_FREEZE_DAYS)
+    return end <= timezone.now() - freeze_period
+
+
+def get_archive_path(kind, key, year, month):
+    if not is_valid_key(kind, key):
+        raise ValueError(f'Недопустимый ключ архива: {key!r}')
+    return os.path.join(settings.ARCHIVE_ROOT, kind, key,
+                        f'{year:04d}-{month:02d}.html')
+
+
+def get_archive_context(kind, key, year, month):
+    start, end = get_period(year, month)
+    posts = Post.objects.visible().filter(pub_date__gte=start,
+                                          pub_date__lt=end)
+    if kind == 'group':
+        group = Group.objects.get(slug=key, is_deleted=False)
+        title = f'Архив группы {group}'
+        posts = posts.filter(group=group).select_related('author', 'group')
+    else:
+        author = User.objects.get(username=key, deletion__isnull=True)
+        title = f'Архив пользователя {author.get_full_name() or author}'
+        posts = posts.filter(author=author).select_related('author', 'group')
+    posts = list(posts)
+    if not posts:
+        raise Post.DoesNotExist('В этом месяце постов нет.')
+    return {
+        'title': title,
+        'period': start,
+        'posts': posts,
+    }
+
+
+def get_anonymous_request():
+    request = HttpRequest()
+    request.user = AnonymousUser()
+    return request
+
+
+def render_archive_page(kind, key, year, month, request=None):
+    context = get_archive_context(kind, key, year, month)
+    return render_to_string(ARCHIVE_TEMPLATE, context,
+                            request=request or get_anonymous_request())
+
+
+def build_archive_page(kind, key, year, month):
+    """Рендерит страницу архива в файл и возвращает путь к нему."""
+    path = get_archive_path(kind, key, year, month)
+    try:
+        content = render_archive_page(kind, key, year, month)
+    except (Group.DoesNotExist, User.DoesNotExist, Post.DoesNotExist):
+        remove_archive_page(kind, key, year, month)
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temp_path, path)
+    return path
+
+
+def remove_archive_page(kind, key, year, month):
+    try:
+        os.remove(get_archive_path(kind, key, year, month))
+    except FileNotFoundError:
+        pass
+
+
+def remove_archive_pages(kind, key):
+    if not is_valid_key(kind, key):
+        return
+    shutil.rmtree(os.path.join(settings.ARCHIVE_ROOT, kind, key),
+                  ignore_errors=True)
+
+
+def get_post_pages(group_slug, username, pub_date):
+    if not is_frozen(pub_date.year, pub_date.month):
+        return set()
+    pages = {('profile', username, pub_date.year, pub_date.month)}
+    if group_slug:
+        pages.add(('group', group_slug, pub_date.year, pub_date.month))
+    return {page for page in pages if is_valid_key(*page[:2])}
+
+
+def rebuild_pages(pages):
+    for page in pages:
+        if os.path.exists(get_archive_path(*page)):
+            build_archive_page(*page)
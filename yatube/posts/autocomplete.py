@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+from django.urls import NoReverseMatch, reverse
+
+from .models import Group, User
+
+USER = 'user'
+GROUP = 'group'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def get_user_entry(user):
+    full_name = user.get_full_name()
+    keys = {normalize(user.username), normalize(full_name),
+            normalize(user.last_name)} - {''}
+    return {
+        'type': USER,
+        'label': (f'{full_name} ({user.username})' if full_name
+                  else user.username),
+        'url': reverse('posts:profile', kwargs={'username': user.username}),
+    }, keys
+
+
+def get_group_entry(group):
+    """Запись группы или None, если для ее slug нет страницы."""
+    try:
+        url = reverse('posts:group_list', kwargs={'slug': group.slug})
+    except NoReverseMatch:
+        return None
+    return {
+        'type': GROUP,
+        'label': group.title,
+        'url': url,
+    }, {normalize(group.title)} - {''}
+
+
+class PrefixIndex:
+    """Отсортированный список ключей с поиском по префиксу через bisect.
+
+    Ключи хранятся как кортежи (ключ, тип, pk), поэтому все записи с
+    общим префиксом лежат подряд, а поиск стоит O(log n + limit).
+    """
+
+    def __init__(self):
+        self.items = []
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls, records):
+        """Индекс из записей (тип, pk, запись, ключи) одной сортировкой."""
+        index = cls()
+        for kind, pk, entry, keys in records:
+            index.items.extend((key, kind, pk) for key in keys)
+            index.entries[(kind, pk)] = (entry, keys)
+        index.items.sort()
+        return index
+
+    def add(self, kind, pk, entry, keys):
+        with self.lock:
+            self._remove((kind, pk))
+            for key in keys:
+                insort(self.items, (key, kind, pk))
+            self.entries[(kind, pk)] = (entry, keys)
+
+    def remove(self, kind, pk):
+        with self.lock:
+            self._remove((kind, pk))
+
+    def _remove(self, ref):
+        entry = self.entries.pop(ref, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect_left(self.items, (key, *ref))
+            if (position < len(self.items)
+                    and self.items[position] == (key, *ref)):
+                del self.items[position]
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        results = []
+        seen = set()
+        with self.lock:
+            items = self.items
+            for position in range(bisect_left(items, (prefix,)), len(items)):
+                key, kind, pk = items[position]
+                if not key.startswith(prefix) or len(results) >= limit:
+                    break
+                if (kind, pk) not in seen:
+                    seen.add((kind, pk))
+                    results.append(self.entries[(kind, pk)][0])
+        return results
+
+
+class Autocomplete:
+    """Индекс пользователей и групп в памяти процесса.
+
+    Строится при первом запросе и обновляется сигналами сохранения и
+    удаления. Изменения из других процессов подхватываются полной
+    перестройкой раз в AUTOCOMPLETE_REBUILD_INTERVAL секунд. Перестройка
+    идет в фоновом потоке, а запросы до ее окончания читают прежний индекс.
+    Изменения, пришедшие во время перестройки, записываются в pending и
+    повторяются на новом индексе перед его подменой.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.built = 0
+        self.lock = threading.RLock()
+        self.rebuilding = None
+        self.pending = None
+
+    def get_index(self):
+        if self.index is None:
+            with self.lock:
+                if self.index is None:
+                    self.rebuild()
+        elif (time.monotonic() - self.built
+              > settings.AUTOCOMPLETE_REBUILD_INTERVAL):
+            self.start_rebuild()
+        return self.index
+
+    def start_rebuild(self):
+        with self.lock:
+            if self.rebuilding is not None and self.rebuilding.is_alive():
+                return
+            self.rebuilding = threading.Thread(target=self.rebuild_in_thread,
+                                               daemon=True)
+            self.rebuilding.start()
+
+    def rebuild_in_thread(self):
+        try:
+            self.rebuild()
+        finally:
+            connections.close_all()
+
+    def rebuild(self):
+        with self.lock:
+            self.pending = []
+        try:
+            index = self.build()
+        except BaseException:
+            with self.lock:
+                self.pending = None
+            raise
+        with self.lock:
+            for name, args in self.pending:
+                getattr(index, name)(*args)
+            self.pending = None
+            self.index = index
+            self.built = time.monotonic()
+
+    def get_records(self):
+        for user in User.objects.filter(is_active=True).iterator():
+            yield (USER, user.pk, *get_user_entry(user))
+        for group in Group.objects.filter(is_deleted=False).iterator():
+            entry = get_group_entry(group)
+            if entry is not None:
+                yield (GROUP, group.pk, *entry)
+
+    def build(self):
+        return PrefixIndex.build(self.get_records())
+
+    def search(self, prefix, limit=None):
+        if not normalize(prefix):
+            return []
+        return self.get_index().search(
+            prefix, limit or settings.AUTOCOMPLETE_LIMIT
+        )
+
+    def apply(self, name, *args):
+        """Вызывает add или remove текущего индекса и строящегося."""
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((name, args))
+            if self.index is not None:
+                getattr(self.index, name)(*args)
+
+    def update_user(self, user):
+        if self.index is None and self.pending is None:
+            return
+        if user.is_active:
+            self.apply('add', USER, user.pk, *get_user_entry(user))
+        else:
+            self.apply('remove', USER, user.pk)
+
+    def update_group(self, group):
+        if self.index is None and self.pending is None:
+            return
+        entry = None if group.is_deleted else get_group_entry(group)
+        if entry is None:
+            self.apply('remove', GROUP, group.pk)
+        else:
+            self.apply('add', GROUP, group.pk, *entry)
+
+    def remove(self, kind, pk):
+        self.apply('remove', kind, pk)
+
+    def reset(self):
+        self.index = None
+
+
+autocomplete = Autocomplete()
@@ -0,0 +1,137 @@
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+
+from core import cache
+
+from . import archive
+from .export import remove_user_exports
+from .images import release_images
+from .likes import remove_user_likes
+from .models import (Comment, Follow, Group, Notification, Post, User,
+                     UserDeletion)
+from .paginator import get_count_key, invalidate_counts
+from .trending import invalidate_trending
+
+BATCH_SIZE = 500
+
+
+def delete_post(post):
+    """Скрывает пост сразу; строки и файлы удаляет purge_deleted."""
+    post.is_deleted = True
+    post.save(update_fields=('is_deleted',))
+    invalidate_trending([post.pk])
+
+
+def delete_group(group):
+    """Скрывает группу сразу; посты отвязываются в purge_deleted."""
+    group.is_deleted = True
+    group.save(update_fields=('is_deleted',))
+    invalidate_counts(get_count_key('group', group.pk))
+    archive.remove_archive_pages('group', group.slug)
+
+
+def delete_user(user):
+    """Деактивирует пользователя и ставит его данные в очередь на удаление.
+
+    Посты автора пропадают из лент сразу, потому что Post.objects.visible()
+    отбрасывает авторов с записью UserDeletion.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=('is_active',))
+        UserDeletion.objects.get_or_create(user=user)
+    posts = Post.objects.filter(author=user).order_by()
+    keys = [get_count_key('index'), get_count_key('author', user.pk)]
+    keys += [get_count_key('group', pk) for pk in
+             posts.filter(group__isnull=False)
+             .values_list('group', flat=True).distinct()]
+    keys += [get_count_key('follow', pk) for pk in
+             user.following.values_list('user', flat=True)]
+    invalidate_counts(*keys)
+    invalidate_trending(author_id=user.pk)
+    archive.remove_archive_pages('profile', user.username)
+    group_pages = (posts.filter(group__isnull=False)
+                   .annotate(month=TruncMonth('pub_date'))
+                   .values_list('group__slug', 'month').distinct())
+    archive.rebuild_pages(
+        ('group', slug, month.year, month.month)
+        for slug, month in group_pages
+        if archive.is_frozen(month.year, month.month)
+    )
+
+
+def delete_in_batches(queryset, batch_size=BATCH_SIZE, ordering='pk'):
+    """Удаляет строки пачками, каждую пачку в отдельной транзакции."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by(ordering)
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+
+
+def purge_posts(posts, batch_size=BATCH_SIZE):
+    """Удаляет посты пачками вместе с комментариями и ненужными картинками.
+
+    Комментарии удаляются заранее своими пачками от новых к старым: ответы
+    создаются позже родителей, поэтому каскад по parent не тянет в память
+    всю ветку обсуждения.
+    """
+    deleted = 0
+    while True:
+        batch = list(posts.order_by('pk')
+                     .values_list('pk', 'image')[:batch_size])
+        if not batch:
+            return deleted
+        ids = [pk for pk, _ in batch]
+        delete_in_batches(Comment.objects.filter(post_id__in=ids),
+                          batch_size, ordering='-pk')
+        with transaction.atomic():
+            Post.objects.filter(pk__in=ids).delete()
+        release_images(image for _, image in batch)
+        deleted += len(ids)
+
+
+def purge_group(group, batch_size=BATCH_SIZE):
+    """Отвязывает посты от группы пачками и удаляет саму группу."""
+    while True:
+        with transaction.atomic():
+            ids = list(Post.objects.filter(group=group).order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            Post.objects.filter(pk__in=ids).update(group=None)
+        cache.invalidate(Post, *ids)
+    group.delete()
+
+
+def purge_user(user, batch_size=BATCH_SIZE):
+    """Удаляет данные пользователя пачками, затем саму учетную запись."""
+    purge_posts(Post.objects.filter(author=user), batch_size)
+    delete_in_batches(Comment.objects.filter(author=user), batch_size)
+    remove_user_likes(user, batch_size)
+    delete_in_batches(Follow.objects.filter(user=user), batch_size)
+    delete_in_batches(Follow.objects.filter(author=user), batch_size)
+    delete_in_batches(Notification.objects.filter(user=user), batch_size)
+    remove_user_exports(user)
+    user.delete()
+
+
+def purge_deleted(batch_size=BATCH_SIZE):
+    """Окончательно удаляет все, что было удалено мягко.
+
+    Возвращает число удаленных постов, групп и пользователей.
+    """
+    posts = purge_posts(Post.objects.filter(is_deleted=True), batch_size)
+    groups = users = 0
+    for group in Group.objects.filter(is_deleted=True).iterator():
+        purge_group(group, batch_size)
+        groups += 1
+    for user in User.objects.filter(deletion__isnull=False).iterator():
+        purge_user(user, batch_size)
+        users += 1
+    return posts, groups, users
@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.files import CHUNK_SIZE
+
+from .images import get_storage
+from .models import Comment, DataExport, Post
+
+
+class ZipStream:
+    """Буфер без seek, в который пишет zipfile.
+
+    Генератор забирает накопленные байты методом pop().
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def get_post_record(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'group': post.group.slug if post.group_id else None,
+        'image': post.image.name or None,
+    }
+
+
+def get_comment_record(comment):
+    return {
+        'id': comment.pk,
+        'post': comment.post_id,
+        'parent': comment.parent_id,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def iter_records(archive, stream, name, queryset, get_record):
+    """Пишет JSON Lines по одной строке на объект, читая БД пачками."""
+    with archive.open(name, 'w') as file:
+        for number, obj in enumerate(
+            queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE), 1
+        ):
+            line = json.dumps(get_record(obj), ensure_ascii=False)
+            file.write(line.encode() + b'\n')
+            if number % settings.EXPORT_CHUNK_SIZE == 0:
+                yield stream.pop()
+    yield stream.pop()
+
+
+def iter_images(archive, stream, user):
+    storage = get_storage()
+    names = (Post.objects.filter(author=user).exclude(image='')
+             .order_by().values_list('image', flat=True).distinct())
+    for name in names.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        if not storage.exists(name):
+            continue
+        with storage.open(name) as source, \
+                archive.open(f'images/{os.path.basename(name)}', 'w') as file:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                file.write(chunk)
+                yield stream.pop()
+    yield stream.pop()
+
+
+def iter_export(user):
+    """Zip-архив с постами, комментариями и картинками пользователя.
+
+    Архив отдается по частям: в памяти одновременно находится только
+    пачка записей или кусок файла.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        yield from iter_records(
+            archive, stream, 'posts.jsonl',
+            Post.objects.filter(author=user).select_related('group'),
+            get_post_record,
+        )
+        yield from iter_records(
+            archive, stream, 'comments.jsonl',
+            Comment.objects.filter(author=user).order_by('pk'),
+            get_comment_record,
+        )
+        yield from iter_images(archive, stream, user)
+    yield stream.pop()
+
+
+def get_export_size(user):
+    return user.posts.count() + user.comments.count()
+
+
+def get_export_path(export):
+    return os.path.join(settings.EXPORT_ROOT, str(export.user_id),
+                        f'{export.pk}.zip')
+
+
+def prepare_export(export):
+    """Записывает архив в файл для последующего скачивания."""
+    path = get_export_path(export)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            for chunk in iter_export(export.user):
+                file.write(chunk)
+        os.replace(temp_path, path)
+    except Exception:
+        export.status = DataExport.FAILED
+        export.save(update_fields=('status',))
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    export.status = DataExport.READY
+    export.path = path
+    export.finished = timezone.now()
+    export.save(update_fields=('status', 'path', 'finished'))
+    return path
+
+
+def remove_expired_exports():
+    threshold = timezone.now() - timedelta(days=settings.EXPORT_KEEP_DAYS)
+    expired = DataExport.objects.filter(created__lt=threshold)
+    for export in expired.iterator():
+        if export.path and os.path.exists(export.path):
+            os.remove(export.path)
+    deleted, _ = expired.delete()
+    return deleted
+
+
+def remove_user_exports(user):
+    shutil.rmtree(os.path.join(settings.EXPORT_ROOT, str(user.pk)),
+                  ignore_errors=True)
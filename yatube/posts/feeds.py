@@ -0,0 +1,22 @@
+from core import cache
+
+from .models import Group, Post, User
+
+
+def get_posts(ids):
+    """Посты с авторами и группами по списку pk из кэша объектов.
+
+    Лента выбирает из БД только упорядоченные pk, а объекты достаются
+    тремя мульти-запросами к кэшу вместо JOIN по всем строкам страницы.
+    """
+    posts = cache.get_many(Post, ids)
+    authors = {user.pk: user for user in
+               cache.get_many(User, {post.author_id for post in posts})}
+    groups = {group.pk: group for group in
+              cache.get_many(Group, {post.group_id for post in posts
+                                     if post.group_id})}
+    for post in posts:
+        Post.author.field.set_cached_value(post, authors.get(post.author_id))
+        if post.group_id:
+            Post.group.field.set_cached_value(post, groups.get(post.group_id))
+    return [post for post in posts if post.author is not None]
@@ -1,6 +1,9 @@
 from django import forms
+from django.utils import timezone
 
-from .models import Comment, Post
+from .models import Comment, NotificationSettings, Post
+
+PUBLISH_AT_FORMAT = '%Y-%m-%dT%H:%M'
 
 
 class PostForm(forms.ModelForm):
@@ -10,7 +13,56 @@ class PostForm(forms.ModelForm):
             'text',
             'group',
             'image',
+            'publish_at',
         )
+        widgets = {
+            'publish_at': forms.DateTimeInput(
+                attrs={'type': 'datetime-local'},
+                format=PUBLISH_AT_FORMAT,
+            ),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and self.instance.is_published:
+            del self.fields['publish_at']
+        else:
+            self.fields['publish_at'].input_formats = [PUBLISH_AT_FORMAT]
+
+    def clean_publish_at(self):
+        publish_at = self.cleaned_data['publish_at']
+        if publish_at is not None and publish_at <= timezone.now():
+            raise forms.ValidationError(
+                'Время публикации должно быть в будущем.'
+            )
+        return publish_at
+
+    def get_update_fields(self):
+        """Поля, которые меняет правка поста.
+
+        Остальные поля, например likes_count, обновляют команды, и
+        устаревшие значения из формы не должны их затирать.
+        """
+        fields = [name for name in self._meta.fields if name in self.fields]
+        if 'publish_at' in self.fields:
+            fields += ['is_published', 'pub_date']
+        return fields
+
+    def save(self, commit=True):
+        """Пост без времени публикации выходит сразу.
+
+        Пост со временем публикации ждет команду publish_scheduled.
+        """
+        post = super().save(commit=False)
+        if 'publish_at' in self.fields:
+            if post.publish_at is None and not post.is_published:
+                post.pub_date = timezone.now()
+            post.is_published = post.publish_at is None
+        if commit:
+            post.save(update_fields=(self.get_update_fields()
+                                     if post.pk else None))
+            self._save_m2m()
+        return post
 
 
 class CommentForm(forms.ModelForm):
@@ -18,4 +70,22 @@ class CommentForm(forms.ModelForm):
         model = Comment
         fields = (
             'text',
+            'parent',
+        )
+        widgets = {
+            'parent': forms.HiddenInput(),
+        }
+
+    def __init__(self, *args, post=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if post is not None:
+            self.fields['parent'].queryset = post.comments.all()
+
+
+class NotificationSettingsForm(forms.ModelForm):
+    class Meta:
+        model = NotificationSettings
+        fields = (
+            'new_posts',
+            'frequency',
         )
@@ -0,0 +1,45 @@
+from django.db.models import Count
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+BATCH_SIZE = 500
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def get_upload_directory():
+    return Post._meta.get_field('image').upload_to.rstrip('/')
+
+
+def get_reference_counts(names):
+    """Возвращает число постов, которые ссылаются на каждый файл."""
+    counts = dict.fromkeys(names, 0)
+    names = list(names)
+    for start in range(0, len(names), BATCH_SIZE):
+        rows = (Post.objects.filter(image__in=names[start:start + BATCH_SIZE])
+                .order_by()
+                .values_list('image')
+                .annotate(references=Count('pk')))
+        counts.update(rows)
+    return counts
+
+
+def delete_image(name):
+    """Удаляет файл вместе с миниатюрами и записями sorl-thumbnail."""
+    storage = get_storage()
+    default.kvstore.delete(ImageFile(name, storage))
+    storage.delete(name)
+
+
+def release_images(names):
+    """Удаляет файлы, на которые больше не ссылается ни один пост."""
+    released = [name for name, references
+                in get_reference_counts(set(names) - {''}).items()
+                if not references]
+    for name in released:
+        delete_image(name)
+    return released
@@ -0,0 +1,97 @@
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from core import cache
+
+from .models import Like, LikeCounterShard, Post
+
+BATCH_SIZE = 500
+
+
+def add_delta(post_id, delta):
+    """Прибавляет delta к случайному счетчику поста.
+
+    Одновременные лайки популярного поста попадают в разные строки и не
+    ждут друг друга на одной строке поста.
+    """
+    shard = random.randrange(settings.LIKE_COUNTER_SHARDS)
+    counters = LikeCounterShard.objects.filter(post_id=post_id, shard=shard)
+    if counters.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounterShard.objects.create(post_id=post_id, shard=shard,
+                                            count=delta)
+    except IntegrityError:
+        counters.update(count=F('count') + delta)
+
+
+def like_post(user, post):
+    with transaction.atomic():
+        _, created = Like.objects.get_or_create(user=user, post=post)
+        if created:
+            add_delta(post.pk, 1)
+    return created
+
+
+def unlike_post(user, post):
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            add_delta(post.pk, -1)
+    return bool(deleted)
+
+
+def get_likes_count(post):
+    """Точное число лайков: сведенное значение плюс несведенные счетчики."""
+    pending = post.like_shards.aggregate(pending=Sum('count'))['pending']
+    return post.likes_count + (pending or 0)
+
+
+def merge_counters(batch_size=BATCH_SIZE):
+    """Сводит счетчики в Post.likes_count и возвращает число постов.
+
+    Счетчик уменьшается на прочитанное значение, а не обнуляется, поэтому
+    лайки, пришедшие во время сведения, не теряются.
+    """
+    merged = set()
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            shards = list(LikeCounterShard.objects.exclude(count=0)
+                          .filter(pk__gt=last_pk)
+                          .order_by('pk')[:batch_size])
+            if not shards:
+                break
+            last_pk = shards[-1].pk
+            totals = Counter()
+            for shard in shards:
+                totals[shard.post_id] += shard.count
+                LikeCounterShard.objects.filter(pk=shard.pk).update(
+                    count=F('count') - shard.count
+                )
+            for post_id, delta in totals.items():
+                Post.objects.filter(pk=post_id).update(
+                    likes_count=F('likes_count') + delta
+                )
+        cache.invalidate(Post, *totals)
+        merged.update(totals)
+    LikeCounterShard.objects.filter(count=0).delete()
+    return len(merged)
+
+
+def remove_user_likes(user, batch_size=BATCH_SIZE):
+    """Удаляет лайки пользователя пачками, вычитая их из счетчиков."""
+    while True:
+        with transaction.atomic():
+            likes = list(Like.objects.filter(user=user).order_by('pk')
+                         .values_list('pk', 'post_id')[:batch_size])
+            if not likes:
+                return
+            Like.objects.filter(pk__in=[pk for pk, _ in likes]).delete()
+            for _, post_id in likes:
+                add_delta(post_id, -1)
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.models import Post
+from posts.tags import sync_batch
+
+
+def process_range(bounds):
+    start, end = bounds
+    posts = (Post.objects.filter(pk__gte=start, pk__lt=end)
+             .values_list('pk', 'text'))
+    return sync_batch(posts)
+
+
+def process_range_in_thread(bounds):
+    """У каждого потока свое соединение с БД, его нужно закрыть."""
+    try:
+        return process_range(bounds)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Разбирает теги уже опубликованных постов параллельными '
+            'пачками по диапазонам pk')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Число потоков. Для SQLite запись все равно '
+                 'последовательная, разумно указать 1.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        batch_size = options['batch_size']
+        last_pk = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        last_pk = last_pk.first() or 0
+        ranges = [(start, start + batch_size)
+                  for start in range(0, last_pk + 1, batch_size)]
+        processed = 0
+        if options['workers'] > 1:
+            executor = ThreadPoolExecutor(max_workers=options['workers'])
+            counts = executor.map(process_range_in_thread, ranges)
+        else:
+            executor = None
+            counts = map(process_range, ranges)
+        try:
+            for count in counts:
+                processed += count
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Обработано постов: {processed}')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {processed} за {elapsed:.1f} с'
+        ))
@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db.models.functions import TruncMonth
+
+from posts import archive
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Рендерит страницы архива групп и авторов в статические файлы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', help='Slug группы')
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить уже существующие страницы',
+        )
+
+    def get_pages(self, group=None, author=None):
+        posts = (Post.objects.visible().order_by()
+                 .annotate(month=TruncMonth('pub_date')))
+        if group:
+            posts = posts.filter(group__slug=group)
+        if author:
+            posts = posts.filter(author__username=author)
+        if not author:
+            rows = (posts.filter(group__isnull=False, group__is_deleted=False)
+                    .values_list('group__slug', 'month').distinct())
+            for slug, month in rows.iterator():
+                yield 'group', slug, month.year, month.month
+        if not group:
+            rows = (posts.values_list('author__username', 'month')
+                    .distinct())
+            for username, month in rows.iterator():
+                yield 'profile', username, month.year, month.month
+
+    def handle(self, *args, **options):
+        built = 0
+        for page in self.get_pages(options['group'], options['author']):
+            kind, key, year, month = page
+            if (not archive.is_valid_key(kind, key)
+                    or not archive.is_frozen(year, month)):
+                continue
+            if (not options['force']
+                    and os.path.exists(archive.get_archive_path(*page))):
+                continue
+            if archive.build_archive_page(*page) is None:
+                continue
+            built += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{kind}/{key}/{year:04d}-{month:02d}')
+        self.stdout.write(self.style.SUCCESS(f'Построено страниц: {built}'))
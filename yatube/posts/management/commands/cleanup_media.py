@@ -0,0 +1,70 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.images import (BATCH_SIZE, delete_image, get_reference_counts,
+                          get_storage, get_upload_directory)
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки постов, на которые не ссылается ни один пост'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Не трогать файлы моложе указанного числа минут',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены',
+        )
+
+    def walk(self, storage, directory):
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for name in directories:
+            yield from self.walk(storage, os.path.join(directory, name))
+
+    def get_candidates(self, storage, grace_minutes):
+        threshold = timezone.now() - timedelta(minutes=grace_minutes)
+        directory = get_upload_directory()
+        if not storage.exists(directory):
+            return
+        for name in self.walk(storage, directory):
+            if name.endswith('.tmp'):
+                continue
+            if storage.get_modified_time(name) < threshold:
+                yield name
+
+    def handle(self, *args, **options):
+        storage = get_storage()
+        checked = deleted = 0
+        batch = []
+        candidates = self.get_candidates(storage, options['grace_minutes'])
+        for name in candidates:
+            batch.append(name)
+            if len(batch) >= BATCH_SIZE:
+                deleted += self.process(batch, options)
+                checked += len(batch)
+                batch = []
+        deleted += self.process(batch, options)
+        checked += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {checked}, удалено: {deleted}'
+        ))
+
+    def process(self, names, options):
+        unused = [name for name, references
+                  in get_reference_counts(names).items() if not references]
+        for name in unused:
+            if options['verbosity'] > 1 or options['dry_run']:
+                self.stdout.write(name)
+            if not options['dry_run']:
+                delete_image(name)
+        return len(unused)
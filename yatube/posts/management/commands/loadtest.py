@@ -0,0 +1,327 @@
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from urllib.parse import urljoin
+
+import requests
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+DEFAULT_MIX = (
+    'index=30,group_list=15,profile=15,post_detail=10,'
+    'follow_index=10,add_comment=5,post_create=2,images=13'
+)
+IMAGE_RE = re.compile(r'<img[^>]+src="([^"]+)"')
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+WRITE_SCENARIOS = ('add_comment', 'post_create')
+FIXTURE_LIMIT = 200
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LoadTest:
+    """Сценарии нагрузки и сбор статистики по именам URL."""
+
+    def __init__(self, base_url, mix, seed, timeout):
+        self.base_url = base_url
+        self.mix = mix
+        self.seed = seed
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.load_fixtures()
+
+    def load_fixtures(self):
+        self.usernames = list(
+            User.objects.filter(posts__isnull=False).distinct()
+            .values_list('username', flat=True)[:FIXTURE_LIMIT]
+        )
+        self.slugs = list(
+            Group.objects.values_list('slug', flat=True)[:FIXTURE_LIMIT]
+        )
+        self.post_ids = list(
+            Post.objects.values_list('pk', flat=True)[:FIXTURE_LIMIT]
+        )
+        self.image_post_ids = list(
+            Post.objects.exclude(image='')
+            .values_list('pk', flat=True)[:FIXTURE_LIMIT]
+        )
+        if not self.post_ids or not self.usernames:
+            raise CommandError('В базе нет постов для нагрузки.')
+        self.session_keys = [
+            self.create_session(user)
+            for user in User.objects.filter(is_active=True)[:20]
+        ]
+
+    def get_session_store(self):
+        return import_module(settings.SESSION_ENGINE).SessionStore()
+
+    def create_session(self, user):
+        session = self.get_session_store()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def delete_sessions(self):
+        store = self.get_session_store()
+        for session_key in self.session_keys:
+            store.delete(session_key)
+
+    def get_client(self, authenticated):
+        attribute = 'user_client' if authenticated else 'guest_client'
+        client = getattr(self.local, attribute, None)
+        if client is None:
+            client = requests.Session()
+            if authenticated:
+                client.cookies.set(settings.SESSION_COOKIE_NAME,
+                                   self.local.random.choice(self.session_keys))
+            setattr(self.local, attribute, client)
+        return client
+
+    def record(self, name, started, response=None):
+        elapsed = time.perf_counter() - started
+        failed = response is None or response.status_code >= 400
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if failed:
+                self.errors[name] += 1
+
+    def request(self, name, path, authenticated=False, method='get',
+                data=None):
+        client = self.get_client(authenticated)
+        url = urljoin(self.base_url, path)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = client.request(method, url, data=data,
+                                      timeout=self.timeout,
+                                      allow_redirects=False)
+        except requests.RequestException:
+            pass
+        self.record(name, started, response)
+        return response
+
+    def get_csrf_token(self, name, path):
+        response = self.request(name, path, authenticated=True)
+        if response is None:
+            return None
+        match = CSRF_RE.search(response.text)
+        return match.group(1) if match else None
+
+    def scenario_index(self, rnd):
+        page = rnd.choice((1, 1, 1, 2, 3))
+        self.request('index', reverse('posts:index') + f'?page={page}')
+
+    def scenario_group_list(self, rnd):
+        if self.slugs:
+            self.request('group_list', reverse(
+                'posts:group_list', kwargs={'slug': rnd.choice(self.slugs)}
+            ))
+
+    def scenario_profile(self, rnd):
+        self.request('profile', reverse(
+            'posts:profile', kwargs={'username': rnd.choice(self.usernames)}
+        ))
+
+    def scenario_post_detail(self, rnd):
+        self.request('post_detail', reverse(
+            'posts:post_detail', kwargs={'post_id': rnd.choice(self.post_ids)}
+        ))
+
+    def scenario_follow_index(self, rnd):
+        if self.session_keys:
+            self.request('follow_index', reverse('posts:follow_index'),
+                         authenticated=True)
+
+    def scenario_add_comment(self, rnd):
+        if not self.session_keys:
+            return
+        post_id = rnd.choice(self.post_ids)
+        token = self.get_csrf_token('post_detail', reverse(
+            'posts:post_detail', kwargs={'post_id': post_id}
+        ))
+        self.request(
+            'add_comment',
+            reverse('posts:add_comment', kwargs={'post_id': post_id}),
+            authenticated=True,
+            method='post',
+            data={'csrfmiddlewaretoken': token,
+                  'text': f'Нагрузочный комментарий {rnd.random()}'},
+        )
+
+    def scenario_post_create(self, rnd):
+        if not self.session_keys:
+            return
+        path = reverse('posts:post_create')
+        token = self.get_csrf_token('post_create', path)
+        self.request(
+            'post_create',
+            path,
+            authenticated=True,
+            method='post',
+            data={'csrfmiddlewaretoken': token,
+                  'text': f'Нагрузочный пост {rnd.random()}'},
+        )
+
+    def scenario_images(self, rnd):
+        post_ids = self.image_post_ids or self.post_ids
+        response = self.request('images', reverse(
+            'posts:post_detail', kwargs={'post_id': rnd.choice(post_ids)}
+        ))
+        if response is None:
+            return
+        for src in IMAGE_RE.findall(response.text):
+            if src.startswith(settings.MEDIA_URL):
+                self.request('media', src)
+
+    def worker(self, number, deadline, requests_left):
+        self.local.random = rnd = random.Random(self.seed + number)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        while time.monotonic() < deadline:
+            with self.lock:
+                if requests_left[0] <= 0:
+                    return
+                requests_left[0] -= 1
+            name = rnd.choices(names, weights)[0]
+            getattr(self, f'scenario_{name}')(rnd)
+
+    def run(self, concurrency, duration, total_requests):
+        deadline = time.monotonic() + duration
+        requests_left = [total_requests or float('inf')]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(self.worker, number, deadline, requests_left)
+                for number in range(concurrency)
+            ]
+            for future in futures:
+                future.result()
+        return time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def parse_mix(value, write=False):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if not hasattr(LoadTest, f'scenario_{name}'):
+            raise CommandError(f'Неизвестный сценарий: {name}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес сценария: {item}')
+    if not write:
+        mix = {name: weight for name, weight in mix.items()
+               if name not in WRITE_SCENARIOS}
+    if not any(mix.values()):
+        raise CommandError('Все веса сценариев равны нулю.')
+    return mix
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест: воспроизводит смесь запросов к сайту и '
+            'выводит пропускную способность, задержки и ошибки по URL. '
+            'Без --write в базу ничего не пишется.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера. По умолчанию запускается '
+                 'встроенный многопоточный WSGI-сервер.',
+        )
+        parser.add_argument('--port', type=int, default=0)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Длительность теста в секундах')
+        parser.add_argument('--requests', type=int, default=0,
+                            help='Ограничение на число сценариев')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help='Веса сценариев: имя=вес через запятую')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--write', action='store_true',
+            help='Включить сценарии add_comment и post_create, которые '
+                 'создают комментарии и посты. Без флага они исключаются '
+                 'из смеси; запускайте с ним только на тестовой базе.',
+        )
+
+    def start_server(self, port):
+        server = ThreadedWSGIServer(('127.0.0.1', port), QuietRequestHandler)
+        server.set_app(get_wsgi_application())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        return server, f'http://{host}:{port}'
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'], options['write'])
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server, base_url = self.start_server(options['port'])
+        try:
+            load_test = LoadTest(base_url, mix, options['seed'],
+                                 options['timeout'])
+            try:
+                elapsed = load_test.run(options['concurrency'],
+                                        options['duration'],
+                                        options['requests'])
+            finally:
+                load_test.delete_sessions()
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        self.report(load_test, elapsed)
+
+    def report(self, load_test, elapsed):
+        header = (f'{"URL":<14}{"запросов":>10}{"в сек.":>10}'
+                  f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+                  f'{"ошибки":>10}')
+        self.stdout.write(header)
+        total = errors = 0
+        for name in sorted(load_test.latencies):
+            values = sorted(load_test.latencies[name])
+            count = len(values)
+            total += count
+            errors += load_test.errors[name]
+            self.stdout.write(
+                f'{name:<14}{count:>10}{count / elapsed:>10.1f}'
+                f'{percentile(values, 0.50) * 1000:>10.1f}'
+                f'{percentile(values, 0.95) * 1000:>10.1f}'
+                f'{percentile(values, 0.99) * 1000:>10.1f}'
+                f'{load_test.errors[name] / count:>10.1%}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего запросов: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.1f} в сек.), '
+            f'ошибок: {errors}'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.likes import BATCH_SIZE, merge_counters
+
+
+class Command(BaseCommand):
+    help = 'Сводит счетчики лайков в Post.likes_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        posts = merge_counters(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено постов: {posts}'
+        ))
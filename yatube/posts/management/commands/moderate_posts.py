@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts import moderation
+from posts.models import Group, User
+
+ACTIONS = {
+    'move': moderation.move_posts,
+    'hide': moderation.hide_posts,
+    'show': moderation.show_posts,
+    'delete': moderation.delete_posts,
+}
+
+
+def parse_date(value):
+    try:
+        date = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise CommandError(f'Дата должна быть в формате ГГГГ-ММ-ДД: {value}')
+    return timezone.make_aware(date)
+
+
+def get_object(model, **kwargs):
+    try:
+        return model.objects.get(**kwargs)
+    except model.DoesNotExist:
+        raise CommandError(f'Не найдено: {kwargs}')
+
+
+class Command(BaseCommand):
+    help = ('Переносит, скрывает, показывает или удаляет посты по фильтру '
+            'пачками UPDATE')
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=sorted(ACTIONS))
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--since', type=parse_date,
+                            help='Дата публикации не раньше, ГГГГ-ММ-ДД')
+        parser.add_argument('--until', type=parse_date,
+                            help='Дата публикации раньше, ГГГГ-ММ-ДД')
+        parser.add_argument('--text', help='Подстрока текста поста')
+        parser.add_argument(
+            '--to-group',
+            help='slug группы для move; без него посты убираются из групп',
+        )
+        parser.add_argument('--batch-size', type=int,
+                            default=moderation.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        posts = moderation.filter_posts(
+            author=(get_object(User, username=options['author'])
+                    if options['author'] else None),
+            group=(get_object(Group, slug=options['group'])
+                   if options['group'] else None),
+            since=options['since'],
+            until=options['until'],
+            text=options['text'],
+        )
+        action = ACTIONS[options['action']]
+        kwargs = {
+            'batch_size': options['batch_size'],
+            'progress': self.report,
+        }
+        if options['action'] == 'move':
+            kwargs['group'] = (get_object(Group, slug=options['to_group'])
+                               if options['to_group'] else None)
+        elif options['to_group']:
+            raise CommandError('--to-group используется только с move')
+        self.total = posts.count()
+        updated = action(posts, **kwargs)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {updated}'
+        ))
+
+    def report(self, updated):
+        self.stdout.write(f'Обработано постов: {updated} из {self.total}')
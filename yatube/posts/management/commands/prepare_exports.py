@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.export import prepare_export, remove_expired_exports
+from posts.models import DataExport
+
+
+class Command(BaseCommand):
+    help = ('Готовит заказанные архивы личных данных и удаляет '
+            'устаревшие архивы')
+
+    def handle(self, *args, **options):
+        prepared = failed = 0
+        pending = DataExport.objects.filter(status=DataExport.PENDING)
+        for export in pending.select_related('user').order_by('pk'):
+            try:
+                prepare_export(export)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'Архив {export.pk}: {error}')
+            else:
+                prepared += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Подготовлено архивов: {prepared}, ошибок: {failed}, '
+            f'удалено устаревших: {remove_expired_exports()}'
+        ))
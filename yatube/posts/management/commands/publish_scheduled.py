@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.moderation import BATCH_SIZE
+from posts.publishing import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = 'Публикует отложенные посты, время которых наступило'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Повторять каждые N секунд; по умолчанию один проход '
+                 'для запуска из cron.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts(options['batch_size'])
+            if published or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Опубликовано постов: {published}'
+                ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
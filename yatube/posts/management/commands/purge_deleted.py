@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.deletion import BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = ('Окончательно удаляет мягко удаленные посты, группы и '
+            'пользователей небольшими транзакциями')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        posts, groups, users = purge_deleted(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено постов: {posts}, групп: {groups}, '
+            f'пользователей: {users}'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import prune_scores, refresh_trending
+
+
+class Command(BaseCommand):
+    help = ('Удаляет устаревшие рейтинги и обновляет кэш популярного; '
+            'запускается по расписанию')
+
+    def handle(self, *args, **options):
+        deleted = prune_scores()
+        posts = refresh_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено рейтингов: {deleted}, в популярном постов: {len(posts)}'
+        ))
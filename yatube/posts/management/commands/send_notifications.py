@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import NotificationSettings
+from posts.notifications import BATCH_SIZE, fan_out, prune_sent, send_digests
+
+
+class Command(BaseCommand):
+    help = ('Создает уведомления о новых постах для подписчиков и '
+            'рассылает письма-дайджесты')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency',
+            choices=[value for value, _
+                     in NotificationSettings.FREQUENCY_CHOICES],
+            default=NotificationSettings.DEFAULT_FREQUENCY,
+            help='Отправить дайджесты пользователям с этой частотой',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--no-send',
+            action='store_true',
+            help='Только создать уведомления, письма не отправлять',
+        )
+
+    def handle(self, *args, **options):
+        posts, notifications = fan_out(options['batch_size'])
+        self.stdout.write(
+            f'Новых постов: {posts}, создано уведомлений: {notifications}'
+        )
+        if options['no_send']:
+            return
+        messages, sent, elapsed = send_digests(options['frequency'],
+                                               options['batch_size'])
+        rate = messages / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {messages}, уведомлений: {sent} '
+            f'за {elapsed:.2f} с ({rate:.1f} писем в сек.)'
+        ))
+        self.stdout.write(f'Удалено старых уведомлений: {prune_sent()}')
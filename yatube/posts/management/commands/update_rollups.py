@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.analytics import BATCH_SIZE, update_rollups
+
+
+class Command(BaseCommand):
+    help = ('Дописывает в дневные сводки посты, комментарии и подписки, '
+            'появившиеся с прошлого запуска')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        processed = update_rollups(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Учтено постов: {processed["posts"]}, '
+            f'комментариев: {processed["comments"]}, '
+            f'подписок: {processed["follows"]}'
+        ))
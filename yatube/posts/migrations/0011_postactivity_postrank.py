@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_auto_20220826_1615'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRank',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('score', models.FloatField(db_index=True, default=0, verbose_name='Рейтинг')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='following', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='follower', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик'),
+        ),
+        migrations.CreateModel(
+            name='PostActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(verbose_name='Начало интервала')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postactivity',
+            index=models.Index(fields=['bucket'], name='posts_posta_bucket_9f87cf_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='postactivity',
+            unique_together={('post', 'bucket')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0012_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDeletion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='deletion', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('requested', models.DateTimeField(auto_now_add=True, verbose_name='Дата запроса')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='is_deleted',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Удалена'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Удален'),
+        ),
+    ]
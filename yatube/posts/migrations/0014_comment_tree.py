@@ -0,0 +1,67 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PATH_STEP = 6
+PATH_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def encode_path_segment(number):
+    digits = ''
+    while number:
+        number, digit = divmod(number, len(PATH_DIGITS))
+        digits = PATH_DIGITS[digit] + digits
+    return digits.rjust(PATH_STEP, '0')
+
+
+def fill_paths(apps, schema_editor):
+    """Существующие комментарии становятся корнями веток по порядку."""
+    Comment = apps.get_model('posts', 'Comment')
+    post_id = number = None
+    batch = []
+    for comment in Comment.objects.order_by('post_id', 'pk').iterator():
+        if comment.post_id != post_id:
+            post_id, number = comment.post_id, 0
+        comment.path = encode_path_segment(number)
+        number += 1
+        batch.append(comment)
+        if len(batch) >= 500:
+            Comment.objects.bulk_update(batch, ['path'])
+            batch = []
+    Comment.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_soft_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Уровень вложенности'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=48, verbose_name='Путь в дереве'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('path',)},
+        ),
+        migrations.AlterUniqueTogether(
+            name='comment',
+            unique_together={('post', 'path')},
+        ),
+    ]
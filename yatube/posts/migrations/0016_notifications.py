@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationSettings',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_settings', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('new_posts', models.BooleanField(default=True, help_text='Письмо со списком новых постов авторов из подписок', verbose_name='Сообщать о новых постах')),
+                ('frequency', models.CharField(choices=[('hourly', 'Раз в час'), ('daily', 'Раз в день')], default='daily', max_length=16, verbose_name='Как часто присылать письма')),
+            ],
+        ),
+        # Уже опубликованные посты считаются разосланными.
+        migrations.AddField(
+            model_name='post',
+            name='notified',
+            field=models.BooleanField(db_index=True, default=True, editable=False, verbose_name='Подписчики уведомлены'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='notified',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Подписчики уведомлены'),
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['sent', 'user'], name='posts_notif_sent_bbb251_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='notification',
+            unique_together={('user', 'post')},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0016_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Готовится'), ('ready', 'Готов'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=16, verbose_name='Состояние')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата запроса')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата готовности')),
+                ('path', models.CharField(blank=True, max_length=255, verbose_name='Путь к архиву')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
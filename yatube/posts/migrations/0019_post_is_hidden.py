@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Скрыт модератором'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0019_post_is_hidden'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Источник')),
+                ('last_id', models.PositiveIntegerField(default=0, verbose_name='Последний учтенный pk')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='follow',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, help_text='Пусто у подписок, созданных до появления поля', null=True, verbose_name='Дата подписки'),
+        ),
+        migrations.CreateModel(
+            name='GroupDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='День')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Посты')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='posts.Group', verbose_name='Группа')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthorDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='День')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Посты')),
+                ('comments', models.PositiveIntegerField(default=0, help_text='Комментарии к постам автора', verbose_name='Комментарии')),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Новые подписчики')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupdailystats',
+            index=models.Index(fields=['date'], name='posts_group_date_27bcf7_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='groupdailystats',
+            unique_together={('group', 'date')},
+        ),
+        migrations.AddIndex(
+            model_name='authordailystats',
+            index=models.Index(fields=['date'], name='posts_autho_date_f99426_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='authordailystats',
+            unique_together={('author', 'date')},
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_published',
+            field=models.BooleanField(db_index=True, default=True, editable=False, help_text='Снимается для отложенных постов, выставляется командой publish_scheduled', verbose_name='Опубликован'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, help_text='Оставьте пустым, чтобы опубликовать пост сразу', null=True, verbose_name='Опубликовать'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_published', 'publish_at'], name='posts_post_is_publ_aa3964_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_scheduled_publication'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='PostRank',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_post_ordering_pk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('rank', models.FloatField(db_index=True, help_text='log2 суммы 2 ** (возраст комментария в периодах полураспада); порядок постов по нему не меняется со временем', verbose_name='Рейтинг')),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='PostActivity',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_post_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_hidden', False), ('is_published', True)), fields=['-pub_date', '-id'], name='post_feed_idx'),
+        ),
+    ]
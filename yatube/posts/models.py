@@ -1,8 +1,32 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, models, transaction
+
+from core.storage import ContentAddressedStorage
 
 User = get_user_model()
 
+COMMENT_PATH_STEP = 6
+COMMENT_PATH_END = '~'
+COMMENT_PATH_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+COMMENT_MAX_DEPTH = 8
+COMMENT_SAVE_ATTEMPTS = 3
+
+
+def encode_path_segment(number):
+    """Порядковый номер в base36 фиксированной ширины.
+
+    При фиксированной ширине лексикографический порядок путей совпадает с
+    порядком обхода дерева в глубину.
+    """
+    base = len(COMMENT_PATH_DIGITS)
+    if number >= base ** COMMENT_PATH_STEP:
+        raise ValueError('Слишком много ответов на один комментарий.')
+    digits = ''
+    while number:
+        number, digit = divmod(number, base)
+        digits = COMMENT_PATH_DIGITS[digit] + digits
+    return digits.rjust(COMMENT_PATH_STEP, '0')
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200,
@@ -10,11 +34,31 @@ class Group(models.Model):
     slug = models.SlugField(unique=True,
                             verbose_name='Slug')
     description = models.TextField(verbose_name='Описание')
+    is_deleted = models.BooleanField(default=False,
+                                     db_index=True,
+                                     verbose_name='Удалена')
 
     def __str__(self):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты, которые видны читателям.
+
+        Отбрасываются удаленные посты, скрытые модератором, еще не
+        опубликованные и посты авторов, стоящих в очереди на удаление.
+        Посты просто деактивированных авторов остаются видны.
+        """
+        return self.filter(is_deleted=False, is_hidden=False,
+                           is_published=True, author__deletion__isnull=True)
+
+    def scheduled(self):
+        """Посты, ожидающие публикации по расписанию."""
+        return self.filter(is_deleted=False, is_hidden=False,
+                           is_published=False)
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста',
                             help_text='Введите текст поста')
@@ -37,16 +81,77 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
         verbose_name='Картинка'
     )
+    is_deleted = models.BooleanField(default=False,
+                                     db_index=True,
+                                     verbose_name='Удален')
+    is_hidden = models.BooleanField(default=False,
+                                    db_index=True,
+                                    verbose_name='Скрыт модератором')
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Опубликовать',
+        help_text='Оставьте пустым, чтобы опубликовать пост сразу'
+    )
+    is_published = models.BooleanField(
+        default=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Опубликован',
+        help_text='Снимается для отложенных постов, выставляется командой '
+                  'publish_scheduled'
+    )
+    likes_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Лайки',
+        help_text='Сводится из счетчиков LikeCounterShard командой '
+                  'merge_like_counters'
+    )
+    notified = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        verbose_name='Подписчики уведомлены'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-pk')
+        indexes = [
+            models.Index(fields=['is_published', 'publish_at']),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_feed_idx',
+                condition=models.Q(is_published=True, is_deleted=False,
+                                   is_hidden=False),
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def is_visible(self):
+        """То же условие, что и PostQuerySet.visible(), для одного поста."""
+        return (not self.is_deleted and not self.is_hidden
+                and self.is_published
+                and not UserDeletion.objects.filter(
+                    user_id=self.author_id).exists())
+
+
+class CommentQuerySet(models.QuerySet):
+    def subtree(self, comment):
+        """Комментарий со всеми ответами одним диапазонным запросом."""
+        return self.filter(post_id=comment.post_id,
+                           path__gte=comment.path,
+                           path__lt=comment.path + COMMENT_PATH_END)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -68,6 +173,64 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='replies',
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(
+        max_length=COMMENT_PATH_STEP * COMMENT_MAX_DEPTH,
+        editable=False,
+        verbose_name='Путь в дереве'
+    )
+    depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Уровень вложенности'
+    )
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('path',)
+        unique_together = [
+            ['post', 'path']
+        ]
+
+    def get_next_path(self):
+        """Путь следующего ответа родителю по последнему пути в поддереве."""
+        parent = self.parent
+        while parent is not None and parent.depth + 1 >= COMMENT_MAX_DEPTH:
+            parent = parent.parent
+        self.parent = parent
+        siblings = Comment.objects.filter(post_id=self.post_id)
+        prefix = ''
+        if parent is not None:
+            prefix = parent.path
+            siblings = siblings.filter(path__gt=prefix,
+                                       path__lt=prefix + COMMENT_PATH_END)
+        last = siblings.aggregate(last=models.Max('path'))['last']
+        number = 0
+        if last:
+            segment = last[len(prefix):len(prefix) + COMMENT_PATH_STEP]
+            number = int(segment, len(COMMENT_PATH_DIGITS)) + 1
+        return prefix + encode_path_segment(number)
+
+    def save(self, *args, **kwargs):
+        if self.path:
+            return super().save(*args, **kwargs)
+        for attempt in range(COMMENT_SAVE_ATTEMPTS):
+            self.path = self.get_next_path()
+            self.depth = len(self.path) // COMMENT_PATH_STEP - 1
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == COMMENT_SAVE_ATTEMPTS - 1:
+                    raise
 
 
 class Follow(models.Model):
@@ -83,6 +246,12 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор'
     )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        null=True,
+        verbose_name='Дата подписки',
+        help_text='Пусто у подписок, созданных до появления поля'
+    )
 
     class Meta:
         unique_together = [
@@ -91,3 +260,274 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user.username} - {self.author.get_full_name()}'
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Пост'
+    )
+    rank = models.FloatField(
+        db_index=True,
+        verbose_name='Рейтинг',
+        help_text='log2 суммы 2 ** (возраст комментария в периодах '
+                  'полураспада); порядок постов по нему не меняется со '
+                  'временем'
+    )
+
+
+class UserDeletion(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion',
+        verbose_name='Пользователь'
+    )
+    requested = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата запроса'
+    )
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата'
+    )
+
+    class Meta:
+        unique_together = [
+            ['user', 'post']
+        ]
+
+
+class LikeCounterShard(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='like_shards',
+        verbose_name='Пост'
+    )
+    shard = models.PositiveSmallIntegerField(verbose_name='Номер счетчика')
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Еще не сведенные лайки'
+    )
+
+    class Meta:
+        unique_together = [
+            ['post', 'shard']
+        ]
+
+
+class NotificationSettings(models.Model):
+    HOURLY = 'hourly'
+    DAILY = 'daily'
+    FREQUENCY_CHOICES = (
+        (HOURLY, 'Раз в час'),
+        (DAILY, 'Раз в день'),
+    )
+    DEFAULT_FREQUENCY = DAILY
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_settings',
+        verbose_name='Пользователь'
+    )
+    new_posts = models.BooleanField(
+        default=True,
+        verbose_name='Сообщать о новых постах',
+        help_text='Письмо со списком новых постов авторов из подписок'
+    )
+    frequency = models.CharField(
+        max_length=16,
+        choices=FREQUENCY_CHOICES,
+        default=DEFAULT_FREQUENCY,
+        verbose_name='Как часто присылать письма'
+    )
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    sent = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата отправки'
+    )
+
+    class Meta:
+        unique_together = [
+            ['user', 'post']
+        ]
+        indexes = [
+            models.Index(fields=['sent', 'user']),
+        ]
+
+
+class DataExport(models.Model):
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Готовится'),
+        (READY, 'Готов'),
+        (FAILED, 'Ошибка'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='exports',
+        verbose_name='Пользователь'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+        verbose_name='Состояние'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата запроса'
+    )
+    finished = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата готовности'
+    )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Путь к архиву'
+    )
+
+    class Meta:
+        ordering = ('-created',)
+
+
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Тег'
+    )
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Пост'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Тег'
+    )
+
+    class Meta:
+        unique_together = [
+            ['tag', 'post']
+        ]
+
+
+class GroupDailyStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Группа'
+    )
+    date = models.DateField(verbose_name='День')
+    posts = models.PositiveIntegerField(default=0, verbose_name='Посты')
+    comments = models.PositiveIntegerField(default=0,
+                                           verbose_name='Комментарии')
+
+    class Meta:
+        unique_together = [
+            ['group', 'date']
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+
+class AuthorDailyStats(models.Model):
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Автор'
+    )
+    date = models.DateField(verbose_name='День')
+    posts = models.PositiveIntegerField(default=0, verbose_name='Посты')
+    comments = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Комментарии',
+        help_text='Комментарии к постам автора'
+    )
+    followers = models.PositiveIntegerField(default=0,
+                                            verbose_name='Новые подписчики')
+
+    class Meta:
+        unique_together = [
+            ['author', 'date']
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+
+class RollupWatermark(models.Model):
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='Источник'
+    )
+    last_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Последний учтенный pk'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
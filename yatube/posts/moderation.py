@@ -0,0 +1,121 @@
+from django.db import transaction
+
+from core import cache
+
+from . import archive
+from .models import Follow, Post
+from .paginator import get_count_key, invalidate_counts
+from .trending import invalidate_trending
+
+BATCH_SIZE = 500
+
+
+def filter_posts(author=None, group=None, since=None, until=None,
+                 text=None):
+    """Посты под фильтр модерации; пустой параметр не ограничивает выборку.
+
+    Период задается полуинтервалом [since, until).
+    """
+    posts = Post.objects.all()
+    if author is not None:
+        posts = posts.filter(author=author)
+    if group is not None:
+        posts = posts.filter(group=group)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=since)
+    if until is not None:
+        posts = posts.filter(pub_date__lt=until)
+    if text:
+        posts = posts.filter(text__icontains=text)
+    return posts
+
+
+def get_count_keys(rows, new_group=None):
+    author_ids = {author_id for _, author_id, _, _, _, _, _ in rows}
+    group_ids = {group_id for _, _, _, group_id, _, _, _ in rows}
+    if new_group is not None:
+        group_ids.add(new_group.pk)
+    keys = [get_count_key('index')]
+    keys += [get_count_key('author', pk) for pk in author_ids]
+    keys += [get_count_key('group', pk) for pk in group_ids - {None}]
+    keys += [get_count_key('follow', pk) for pk in
+             Follow.objects.filter(author_id__in=author_ids)
+             .values_list('user_id', flat=True).distinct()]
+    return keys
+
+
+def get_archive_pages(rows, new_group=None):
+    """Архивные страницы, на которых пост был или окажется.
+
+    Дата publish_at учитывается, потому что при публикации пост переезжает
+    в архив ее месяца.
+    """
+    pages = set()
+    for _, _, username, _, group_slug, pub_date, publish_at in rows:
+        for date in {pub_date, publish_at} - {None}:
+            pages |= archive.get_post_pages(group_slug, username, date)
+            if new_group is not None:
+                pages |= archive.get_post_pages(new_group.slug, username,
+                                                date)
+    return pages
+
+
+def update_in_batches(posts, values, batch_size=BATCH_SIZE, progress=None,
+                      on_update=None):
+    """Меняет поля постов пачками UPDATE, каждую пачку в своей транзакции.
+
+    Пачки выбираются по возрастанию pk, поэтому посты, которые после
+    изменения все еще подходят под фильтр, не обрабатываются повторно.
+    После каждой пачки сбрасываются объектный кэш и счетчики лент, в конце
+    пересобираются замороженные архивные страницы. Функция progress, если
+    передана, получает число обработанных постов. Функция on_update, если
+    передана, получает pk пачки в той же транзакции сразу после UPDATE.
+    Возвращает число обработанных постов.
+    """
+    new_group = values.get('group')
+    updated = last_pk = 0
+    pages = set()
+    while True:
+        with transaction.atomic():
+            rows = list(posts.filter(pk__gt=last_pk).order_by('pk')
+                        .values_list('pk', 'author_id', 'author__username',
+                                     'group_id', 'group__slug',
+                                     'pub_date', 'publish_at')[:batch_size])
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            Post.objects.filter(pk__in=ids).update(**values)
+            if on_update is not None:
+                on_update(ids)
+        last_pk = ids[-1]
+        cache.invalidate(Post, *ids)
+        invalidate_trending(ids)
+        invalidate_counts(*get_count_keys(rows, new_group))
+        pages |= get_archive_pages(rows, new_group)
+        updated += len(ids)
+        if progress is not None:
+            progress(updated)
+    if updated:
+        archive.rebuild_pages(pages)
+    return updated
+
+
+def move_posts(posts, group, batch_size=BATCH_SIZE, progress=None):
+    """Переносит посты в группу; group=None убирает их из групп."""
+    return update_in_batches(posts, {'group': group}, batch_size, progress)
+
+
+def hide_posts(posts, batch_size=BATCH_SIZE, progress=None):
+    return update_in_batches(posts, {'is_hidden': True}, batch_size,
+                             progress)
+
+
+def show_posts(posts, batch_size=BATCH_SIZE, progress=None):
+    return update_in_batches(posts, {'is_hidden': False}, batch_size,
+                             progress)
+
+
+def delete_posts(posts, batch_size=BATCH_SIZE, progress=None):
+    """Мягко удаляет посты; строки и файлы удалит purge_deleted."""
+    return update_in_batches(posts, {'is_deleted': True}, batch_size,
+                             progress)
@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core import cache
+
+from .models import Follow, Notification, NotificationSettings, Post, User
+
+BATCH_SIZE = 500
+DIGEST_SUBJECT = 'Новые посты авторов из ваших подписок'
+DIGEST_TEMPLATE = 'posts/email/digest.txt'
+
+
+def get_subscribers(author_id):
+    """Подписчики автора, которые хотят получать письма о новых постах."""
+    return (Follow.objects.filter(author_id=author_id)
+            .exclude(user__email='')
+            .exclude(user__notification_settings__new_posts=False)
+            .filter(user__is_active=True)
+            .order_by('user_id')
+            .values_list('user_id', flat=True))
+
+
+def fan_out(batch_size=BATCH_SIZE):
+    """Создает уведомления для подписчиков новых постов.
+
+    Запускается по расписанию, поэтому публикация поста не ждет рассылки.
+    Возвращает число постов и созданных уведомлений.
+    """
+    posts = notifications = 0
+    while True:
+        pending = list(Post.objects.visible().filter(notified=False)
+                       .order_by('pk')
+                       .values_list('pk', 'author_id')[:batch_size])
+        if not pending:
+            return posts, notifications
+        for post_id, author_id in pending:
+            notifications += notify_subscribers(post_id, author_id,
+                                                batch_size)
+        posts += len(pending)
+
+
+def notify_subscribers(post_id, author_id, batch_size=BATCH_SIZE):
+    """Создает уведомления пачками по возрастанию user_id.
+
+    В памяти одновременно держится не больше batch_size подписчиков.
+    """
+    created = last_id = 0
+    with transaction.atomic():
+        while True:
+            user_ids = list(get_subscribers(author_id)
+                            .filter(user_id__gt=last_id)[:batch_size])
+            if not user_ids:
+                break
+            Notification.objects.bulk_create(
+                [Notification(user_id=user_id, post_id=post_id)
+                 for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+            last_id = user_ids[-1]
+            created += len(user_ids)
+        Post.objects.filter(pk=post_id).update(notified=True)
+    cache.invalidate(Post, post_id)
+    return created
+
+
+def get_recipients(frequency):
+    query = Q(notification_settings__frequency=frequency)
+    if frequency == NotificationSettings.DEFAULT_FREQUENCY:
+        query |= Q(notification_settings__isnull=True)
+    return (User.objects.filter(query)
+            .filter(is_active=True, notifications__sent__isnull=True)
+            .exclude(email='')
+            .exclude(notification_settings__new_posts=False)
+            .distinct().order_by('pk'))
+
+
+def build_digest(user, notifications):
+    """Письмо со списком постов или None, если все посты уже удалены.
+
+    Видимость поста заранее отмечена в post_visible запросом send_digests.
+    """
+    posts = [notification.post for notification in notifications
+             if notification.post_visible]
+    if not posts:
+        return None
+    body = render_to_string(DIGEST_TEMPLATE, {'user': user, 'posts': posts})
+    return EmailMessage(DIGEST_SUBJECT, body, to=[user.email])
+
+
+def send_digests(frequency, batch_size=BATCH_SIZE):
+    """Рассылает письма-дайджесты через одно соединение EMAIL_BACKEND.
+
+    Письма уходят пачками по batch_size штук. Возвращает число писем,
+    уведомлений и затраченное время в секундах.
+    """
+    started = time.perf_counter()
+    messages = notifications = 0
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    try:
+        last_pk = 0
+        while True:
+            users = list(get_recipients(frequency)
+                         .filter(pk__gt=last_pk)[:batch_size])
+            if not users:
+                break
+            last_pk = users[-1].pk
+            pending = (Notification.objects
+                       .filter(user__in=users, sent__isnull=True)
+                       .annotate(post_visible=Exists(
+                           Post.objects.visible().filter(
+                               pk=OuterRef('post_id')
+                           )
+                       ))
+                       .select_related('post__author', 'post__group')
+                       .order_by('user_id', 'pk'))
+            by_user = {}
+            for notification in pending:
+                by_user.setdefault(notification.user_id, []).append(
+                    notification
+                )
+            batch = [build_digest(user, by_user[user.pk])
+                     for user in users if user.pk in by_user]
+            batch = [message for message in batch if message is not None]
+            connection.send_messages(batch)
+            ids = [notification.pk for user_notifications in by_user.values()
+                   for notification in user_notifications]
+            Notification.objects.filter(pk__in=ids).update(
+                sent=timezone.now()
+            )
+            messages += len(batch)
+            notifications += len(ids)
+    finally:
+        connection.close()
+    return messages, notifications, time.perf_counter() - started
+
+
+def prune_sent():
+    """Удаляет старые отправленные уведомления и неотправленные
+    уведомления пользователей, отключивших рассылку."""
+    threshold = timezone.now() - timedelta(
+        days=settings.NOTIFICATIONS_KEEP_DAYS
+    )
+    deleted, _ = Notification.objects.filter(
+        Q(sent__lt=threshold)
+        | Q(sent__isnull=True, user__notification_settings__new_posts=False)
+    ).delete()
+    return deleted
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_CACHE_PREFIX = 'posts_count'
+
+
+def get_count_key(scope, pk=None):
+    if pk is None:
+        return f'{COUNT_CACHE_PREFIX}:{scope}'
+    return f'{COUNT_CACHE_PREFIX}:{scope}:{pk}'
+
+
+def invalidate_counts(*keys):
+    cache.delete_many(keys)
+
+
+def get_cached_count(key, queryset):
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator с кэшированным числом объектов и сокращенным списком страниц.
+
+    Число объектов хранится в кэше под ключом count_key. Ключи сбрасываются
+    сигналами при изменении постов, а TTL ограничивает устаревание для лент,
+    которые сигналы не отслеживают.
+    """
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, count_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        return get_cached_count(self.count_key, self.object_list)
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > (1 + on_each_side + on_ends) + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < (self.num_pages - on_each_side - on_ends) - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1,
+                             self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+    def _get_page(self, *args, **kwargs):
+        page = super()._get_page(*args, **kwargs)
+        page.elided_page_range = list(
+            self.get_elided_page_range(page.number)
+        )
+        return page
+
+
+def get_keyset_page(queryset, field, after, limit):
+    """Страница после курсора after в порядке field.
+
+    В отличие от OFFSET стоимость запроса не зависит от номера страницы.
+    Поле с минусом ('-post_id') сортируется по убыванию. Неуникальное поле
+    дополняется уникальным кортежем с тем же направлением, например
+    ('-pub_date', '-pk'); тогда after и курсор тоже кортежи. Возвращает
+    объекты и курсор следующей страницы или None.
+    """
+    fields = (field,) if isinstance(field, str) else tuple(field)
+    names = [name.lstrip('-') for name in fields]
+    if after:
+        values = (after,) if isinstance(field, str) else tuple(after)
+        lookup = 'lt' if fields[0].startswith('-') else 'gt'
+        condition = Q()
+        for position, name in enumerate(names):
+            condition |= Q(**dict(zip(names[:position], values)),
+                           **{f'{name}__{lookup}': values[position]})
+        queryset = queryset.filter(condition)
+    objects = list(queryset.order_by(*fields)[:limit + 1])
+    if len(objects) <= limit:
+        return objects, None
+    objects = objects[:limit]
+    cursor = tuple(getattr(objects[-1], name) for name in names)
+    return objects, cursor[0] if isinstance(field, str) else cursor
@@ -0,0 +1,33 @@
+from django.db.models import F
+from django.utils import timezone
+
+from .analytics import count_published
+from .models import Post
+from .moderation import BATCH_SIZE, update_in_batches
+
+
+def get_due_posts(now=None):
+    """Очередь отложенных постов, время которых наступило.
+
+    Условие покрывается индексом (is_published, publish_at), поэтому
+    выборка не просматривает опубликованные посты.
+    """
+    return Post.objects.filter(is_published=False,
+                               publish_at__lte=now or timezone.now())
+
+
+def publish_due_posts(batch_size=BATCH_SIZE, progress=None, now=None):
+    """Публикует наступившие посты пачками UPDATE.
+
+    Дата публикации становится равной publish_at, чтобы пост встал в
+    ленты на свое место. Объектный кэш и счетчики лент, включая ленты
+    подписчиков, сбрасывает update_in_batches. Пост попадает в сводки
+    аналитики в той же транзакции. Возвращает число постов.
+    """
+    return update_in_batches(
+        get_due_posts(now),
+        {'is_published': True, 'pub_date': F('publish_at')},
+        batch_size,
+        progress,
+        count_published,
+    )
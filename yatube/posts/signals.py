@@ -0,0 +1,84 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import cache
+
+from . import archive, trending
+from .autocomplete import GROUP, USER, autocomplete
+from .models import Comment, Group, Post, User
+from .paginator import get_count_key, invalidate_counts
+
+cache.register(Post)
+cache.register(Group)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        trending.record_activity(instance.post_id, instance.created)
+
+
+def get_archive_pages(post):
+    if post.pub_date is None:
+        return set()
+    if not archive.is_frozen(post.pub_date.year, post.pub_date.month):
+        return set()
+    group_slug = post.group.slug if post.group_id else None
+    return archive.get_post_pages(group_slug, post.author.username,
+                                  post.pub_date)
+
+
+def invalidate_post_counts(post, old_group_id=None):
+    keys = [
+        get_count_key('index'),
+        get_count_key('author', post.author_id),
+    ]
+    for group_id in {post.group_id, old_group_id} - {None}:
+        keys.append(get_count_key('group', group_id))
+    invalidate_counts(*keys)
+
+
+@receiver(pre_save, sender=Post)
+def post_before_save(sender, instance, **kwargs):
+    instance._archive_pages = set()
+    instance._old_group_id = None
+    if instance.pk is None:
+        return
+    old_post = (Post.objects.filter(pk=instance.pk)
+                .select_related('author', 'group').first())
+    if old_post is not None:
+        instance._archive_pages = get_archive_pages(old_post)
+        instance._old_group_id = old_post.group_id
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    invalidate_post_counts(instance, getattr(instance, '_old_group_id', None))
+    pages = getattr(instance, '_archive_pages', set())
+    archive.rebuild_pages(pages | get_archive_pages(instance))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    invalidate_post_counts(instance)
+    archive.rebuild_pages(get_archive_pages(instance))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    autocomplete.update_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    autocomplete.remove(USER, instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    autocomplete.update_group(instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    autocomplete.remove(GROUP, instance.pk)
@@ -0,0 +1,49 @@
+import re
+
+from django.db import transaction
+
+from .models import PostTag, Tag
+
+TAG_RE = re.compile(r'(?<![\w&])#(\w{1,100})(?!\w)')
+
+
+def normalize_tag(name):
+    return name.lower()
+
+
+def extract_tags(text):
+    return {normalize_tag(name) for name in TAG_RE.findall(text)}
+
+
+def get_tags(names):
+    """Теги по именам; недостающие создаются одной пачкой."""
+    names = set(names)
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names],
+                            ignore_conflicts=True)
+    return dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+
+
+def sync_tags(post):
+    """Приводит связи поста с тегами в соответствие с его текстом."""
+    tags = get_tags(extract_tags(post.text))
+    with transaction.atomic():
+        post.post_tags.exclude(tag_id__in=tags.values()).delete()
+        PostTag.objects.bulk_create(
+            [PostTag(post=post, tag_id=tag_id) for tag_id in tags.values()],
+            ignore_conflicts=True,
+        )
+
+
+def sync_batch(posts):
+    """Разбирает теги пачки постов: три запроса на пачку."""
+    post_names = {post_id: extract_tags(text) for post_id, text in posts}
+    tags = get_tags(set().union(*post_names.values()))
+    with transaction.atomic():
+        PostTag.objects.bulk_create(
+            [PostTag(post_id=post_id, tag_id=tags[name])
+             for post_id, names in post_names.items() for name in names],
+            ignore_conflicts=True,
+        )
+    return len(post_names)
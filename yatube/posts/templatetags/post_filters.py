@@ -0,0 +1,21 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from posts.tags import TAG_RE, normalize_tag
+
+register = template.Library()
+
+
+@register.filter(needs_autoescape=True)
+def linktags(text, autoescape=True):
+    """Превращает #теги в тексте в ссылки на страницы тегов."""
+    if autoescape:
+        text = conditional_escape(text)
+
+    def replace(match):
+        url = reverse('posts:tag_posts',
+                      kwargs={'name': normalize_tag(match.group(1))})
+        return f'<a href="{url}">{match.group(0)}</a>'
+    return mark_safe(TAG_RE.sub(replace, text))
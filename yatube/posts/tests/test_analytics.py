@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import analytics
+from posts.models import (AuthorDailyStats, Comment, Follow, Group,
+                          GroupDailyStats, Post)
+from posts.publishing import publish_due_posts
+
+User = get_user_model()
+
+
+class AnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='stats-author')
+        cls.reader = User.objects.create_user(username='stats-reader')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        cls.group = Group.objects.create(
+            title='Группа', slug='stats', description='Описание'
+        )
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(AnalyticsTests.staff)
+
+    def create_activity(self):
+        post = Post.objects.create(author=AnalyticsTests.author,
+                                   group=AnalyticsTests.group,
+                                   text='Пост')
+        Post.objects.create(author=AnalyticsTests.author, text='Без группы')
+        Comment.objects.create(post=post, author=AnalyticsTests.reader,
+                               text='Комментарий')
+
+    def test_rollups_are_incremental(self):
+        """Повторный запуск учитывает только новые строки."""
+        self.create_activity()
+        Follow.objects.create(user=AnalyticsTests.reader,
+                              author=AnalyticsTests.author)
+        self.assertEqual(analytics.update_rollups(batch_size=1),
+                         {'posts': 2, 'comments': 1, 'follows': 1})
+        self.assertEqual(analytics.update_rollups(),
+                         {'posts': 0, 'comments': 0, 'follows': 0})
+        self.create_activity()
+        analytics.update_rollups()
+        today = timezone.localdate()
+        group_stats = GroupDailyStats.objects.get(
+            group=AnalyticsTests.group, date=today
+        )
+        self.assertEqual((group_stats.posts, group_stats.comments), (2, 2))
+        author_stats = AuthorDailyStats.objects.get(
+            author=AnalyticsTests.author, date=today
+        )
+        self.assertEqual(
+            (author_stats.posts, author_stats.comments,
+             author_stats.followers),
+            (4, 2, 1)
+        )
+
+    def test_follows_without_date_are_skipped(self):
+        """Подписки без даты не попадают в сводку, но метка их проходит."""
+        follow = Follow.objects.create(user=AnalyticsTests.reader,
+                                       author=AnalyticsTests.author)
+        Follow.objects.filter(pk=follow.pk).update(created=None)
+        self.assertEqual(analytics.roll_up('follows'), 1)
+        self.assertFalse(AuthorDailyStats.objects.exists())
+        self.assertEqual(analytics.roll_up('follows'), 0)
+
+    def test_only_visible_posts_are_rolled_up(self):
+        """Скрытые и удаленные посты в сводку не попадают."""
+        self.create_activity()
+        Post.objects.create(author=AnalyticsTests.author, text='Скрытый',
+                            is_hidden=True)
+        Post.objects.create(author=AnalyticsTests.author, text='Удаленный',
+                            is_deleted=True)
+        self.assertEqual(analytics.roll_up('posts'), 4)
+        self.assertEqual(
+            AuthorDailyStats.objects.get(author=AnalyticsTests.author).posts,
+            2
+        )
+
+    def test_scheduled_post_counted_on_publish_date(self):
+        """Отложенный пост учитывается один раз в день публикации."""
+        publish_at = timezone.now() + timedelta(days=3)
+        post = Post.objects.create(author=AnalyticsTests.author,
+                                   text='Отложенный', is_published=False,
+                                   publish_at=publish_at)
+        analytics.roll_up('posts')
+        self.assertFalse(AuthorDailyStats.objects.exists())
+        publish_due_posts(now=publish_at)
+        self.assertEqual(analytics.roll_up('posts'), 0)
+        stats = AuthorDailyStats.objects.get(author=AnalyticsTests.author)
+        self.assertEqual(
+            (stats.date, stats.posts),
+            (timezone.localdate(publish_at), 1)
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.pub_date, publish_at)
+
+    def test_dashboard_reads_only_rollups(self):
+        """Панель читает сводки, а не таблицы постов и комментариев."""
+        self.create_activity()
+        analytics.update_rollups()
+        urls = (
+            reverse('posts:analytics'),
+            reverse('posts:group_analytics',
+                    kwargs={'slug': AnalyticsTests.group.slug}),
+            reverse('posts:author_analytics',
+                    kwargs={'username': AnalyticsTests.author.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.staff_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for query in queries.captured_queries:
+                    self.assertNotIn('"posts_post"', query['sql'])
+                    self.assertNotIn('"posts_comment"', query['sql'])
+        response = self.staff_client.get(reverse('posts:analytics'))
+        self.assertContains(response, AnalyticsTests.group.title)
+
+    def test_dashboard_is_staff_only(self):
+        """Панель недоступна обычным пользователям."""
+        client = Client()
+        client.force_login(AnalyticsTests.reader)
+        response = client.get(reverse('posts:analytics'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive
+from posts.models import Group, Post
+
+User = get_user_model()
+
+TEMP_ARCHIVE_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(ARCHIVE_ROOT=TEMP_ARCHIVE_ROOT)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='archive-author')
+        cls.group = Group.objects.create(
+            title='Группа архива',
+            slug='archive-group',
+            description='Для тестирования архива'
+        )
+        cls.post = Post.objects.create(author=cls.author,
+                                       group=cls.group,
+                                       text='Старый пост')
+        Post.objects.filter(pk=cls.post.pk).update(
+            pub_date=datetime(2020, 5, 10, tzinfo=timezone.utc)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ARCHIVE_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_archive_page_is_built_and_served(self):
+        """Страница архива сохраняется в файл и отдается без запросов к БД."""
+        url = reverse('posts:group_archive',
+                      kwargs={'slug': ArchiveTests.group.slug,
+                              'year': 2020, 'month': 5})
+        response = self.guest_client.get(url)
+        self.assertContains(response, ArchiveTests.post.text)
+        path = archive.get_archive_path('group', ArchiveTests.group.slug,
+                                        2020, 5)
+        self.assertTrue(os.path.exists(path))
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertIn(ArchiveTests.post.text.encode(),
+                      b''.join(response.streaming_content))
+
+    def test_edit_regenerates_affected_pages(self):
+        """Изменение старого поста перестраивает его страницы архива."""
+        archive.build_archive_page('profile', ArchiveTests.author.username,
+                                   2020, 5)
+        post = Post.objects.get(pk=ArchiveTests.post.pk)
+        post.text = 'Исправленный старый пост'
+        post.save()
+        path = archive.get_archive_path(
+            'profile', ArchiveTests.author.username, 2020, 5
+        )
+        with open(path, encoding='utf-8') as file:
+            self.assertIn(post.text, file.read())
+        self.assertFalse(os.path.exists(archive.get_archive_path(
+            'profile', ArchiveTests.author.username, 2020, 6
+        )))
+
+    def test_invalid_periods_return_404(self):
+        """Недопустимые и пустые месяцы дают 404 и не пишут файлы."""
+        today = timezone.now()
+        periods = ((0, 1), (99999, 1), (2020, 13), (1900, 1), (2020, 4),
+                   (today.year, today.month))
+        for year, month in periods:
+            with self.subTest(year=year, month=month):
+                url = reverse('posts:group_archive',
+                              kwargs={'slug': ArchiveTests.group.slug,
+                                      'year': year, 'month': month})
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+        for year, month in ((1900, 1), (2020, 4)):
+            self.assertFalse(os.path.exists(archive.get_archive_path(
+                'group', ArchiveTests.group.slug, year, month
+            )))
+
+    def test_unsafe_key_is_rejected(self):
+        """Ключ, выходящий за пределы каталога архива, отклоняется."""
+        url = reverse('posts:profile_archive',
+                      kwargs={'username': '..', 'year': 2020, 'month': 5})
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+        with self.assertRaises(ValueError):
+            archive.get_archive_path('profile', '..', 2020, 5)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.autocomplete import autocomplete
+from posts.deletion import delete_group, delete_user
+from posts.models import Group
+
+User = get_user_model()
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='leo', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Литература', slug='books', description='Книги'
+        )
+
+    def setUp(self):
+        autocomplete.reset()
+        self.client = Client()
+        self.url = reverse('posts:autocomplete')
+
+    def get_labels(self, query):
+        response = self.client.get(self.url, {'q': query})
+        return [result['label'] for result in response.json()['results']]
+
+    def test_prefix_search(self):
+        """Поиск по префиксу логина, имени, фамилии и названия группы."""
+        self.assertEqual(self.get_labels('le'), ['Лев Толстой (leo)'])
+        self.assertEqual(self.get_labels('тол'), ['Лев Толстой (leo)'])
+        self.assertEqual(self.get_labels('ЛИТ'), ['Литература'])
+        self.assertEqual(self.get_labels('л'),
+                         ['Лев Толстой (leo)', 'Литература'])
+        self.assertEqual(self.get_labels(''), [])
+
+    def test_lookup_does_not_query_database(self):
+        """После построения индекса запросы не обращаются к БД."""
+        self.get_labels('l')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_labels('leo'), ['Лев Толстой (leo)'])
+
+    def test_index_is_updated_incrementally(self):
+        """Сохранение и удаление объектов меняет индекс без перестройки."""
+        self.get_labels('l')
+        built = autocomplete.built
+        User.objects.create_user(username='lermontov')
+        group = Group.objects.get(pk=AutocompleteTests.group.pk)
+        group.title = 'Проза'
+        group.save()
+        self.assertEqual(self.get_labels('ler'), ['lermontov'])
+        self.assertEqual(self.get_labels('лит'), [])
+        self.assertEqual(self.get_labels('про'), ['Проза'])
+        delete_group(group)
+        delete_user(User.objects.get(pk=AutocompleteTests.user.pk))
+        self.assertEqual(self.get_labels('л'), [])
+        self.assertEqual(autocomplete.built, built)
+
+    def test_stale_index_is_rebuilt_in_background(self):
+        """Устаревший индекс отвечает сразу, перестройка идет в потоке."""
+        self.get_labels('l')
+        User.objects.filter(pk=AutocompleteTests.user.pk).update(
+            username='lion'
+        )
+        autocomplete.built = float('-inf')
+        with mock.patch('posts.autocomplete.threading.Thread') as thread:
+            self.assertEqual(self.get_labels('le'), ['Лев Толстой (leo)'])
+        thread.assert_called_once_with(
+            target=autocomplete.rebuild_in_thread, daemon=True
+        )
+        thread.return_value.start.assert_called_once_with()
+        autocomplete.rebuild()
+        self.assertEqual(self.get_labels('li'), ['Лев Толстой (lion)'])
+        self.assertEqual(self.get_labels('le'), [])
+
+    def test_updates_during_rebuild_are_replayed(self):
+        """Изменения во время перестройки попадают в новый индекс."""
+        self.get_labels('l')
+        build = autocomplete.build
+
+        def build_with_update():
+            index = build()
+            User.objects.create_user(username='lermontov')
+            delete_group(Group.objects.get(pk=AutocompleteTests.group.pk))
+            return index
+
+        with mock.patch.object(autocomplete, 'build', build_with_update):
+            autocomplete.rebuild()
+        self.assertEqual(self.get_labels('ler'), ['lermontov'])
+        self.assertEqual(self.get_labels('лит'), [])
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.contrib.sessions.models import Session
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class CleanupMediaTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cleanup-user')
+
+    def create_post(self, content):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(name='image.gif', content=content,
+                                     content_type='image/gif')
+        )
+
+    def test_cleanup_removes_only_unreferenced_files(self):
+        """Удаляются только файлы без ссылок из постов."""
+        shared = self.create_post(SMALL_GIF)
+        duplicate = self.create_post(SMALL_GIF)
+        orphan = self.create_post(SMALL_GIF + b'\x00')
+        storage = shared.image.storage
+        orphan_name = orphan.image.name
+        orphan.delete()
+        duplicate.delete()
+        call_command('cleanup_media', grace_minutes=0, stdout=StringIO())
+        self.assertTrue(storage.exists(shared.image.name))
+        self.assertFalse(storage.exists(orphan_name))
+
+    def test_reupload_refreshes_orphan(self):
+        """Повторная загрузка обновляет время старого файла без ссылок."""
+        orphan = self.create_post(SMALL_GIF + b'\x01')
+        path = orphan.image.path
+        orphan.delete()
+        old = time.time() - 24 * 60 * 60
+        os.utime(path, (old, old))
+        post = self.create_post(SMALL_GIF + b'\x01')
+        self.assertEqual(post.image.path, path)
+        self.assertGreater(os.path.getmtime(path), old)
+        call_command('cleanup_media', grace_minutes=60, stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='loadtest-user')
+        Post.objects.create(author=user, text='Пост для нагрузки')
+
+    def test_smoke_run_does_not_write(self):
+        """Без --write нагрузочный тест не меняет базу."""
+        out = StringIO()
+        call_command('loadtest', requests=20, concurrency=2, seed=1,
+                     mix='index=1,post_detail=1,add_comment=1,post_create=1',
+                     stdout=out)
+        self.assertIn('ошибок: 0', out.getvalue())
+        self.assertIn('post_detail', out.getvalue())
+        self.assertNotIn('add_comment', out.getvalue())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import COMMENT_MAX_DEPTH, Comment, Post
+
+User = get_user_model()
+
+
+class CommentTreeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='commentator')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CommentTreeTests.user)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(post=CommentTreeTests.post,
+                                      author=CommentTreeTests.user,
+                                      parent=parent,
+                                      text=text)
+
+    def test_comments_are_ordered_depth_first(self):
+        """Ответы идут сразу после родителя, ветки — по порядку."""
+        first = self.comment('1')
+        second = self.comment('2')
+        self.comment('1.1', first)
+        self.comment('2.1', second)
+        self.comment('1.2', first)
+        self.comment('1.1.1', Comment.objects.get(text='1.1'))
+        texts = [comment.text for comment in
+                 CommentTreeTests.post.comments.all()]
+        self.assertEqual(texts, ['1', '1.1', '1.1.1', '1.2', '2', '2.1'])
+
+    def test_subtree_is_one_range_query(self):
+        """Ветка выбирается одним запросом без соседних веток."""
+        first = self.comment('1')
+        reply = self.comment('1.1', first)
+        self.comment('1.1.1', reply)
+        self.comment('2')
+        with self.assertNumQueries(1):
+            texts = [comment.text for comment in
+                     Comment.objects.subtree(first)]
+        self.assertEqual(texts, ['1', '1.1', '1.1.1'])
+
+    def test_depth_is_limited(self):
+        """Ответ на самом глубоком уровне становится соседом родителя."""
+        parent = None
+        for level in range(COMMENT_MAX_DEPTH + 1):
+            parent = self.comment(str(level), parent)
+        self.assertEqual(parent.depth, COMMENT_MAX_DEPTH - 1)
+
+    def test_reply_form_sets_parent(self):
+        """Форма с parent создает ответ внутри ветки."""
+        root = self.comment('Корень')
+        self.authorized_client.post(
+            reverse('posts:add_comment',
+                    kwargs={'post_id': CommentTreeTests.post.pk}),
+            data={'text': 'Ответ', 'parent': root.pk},
+        )
+        reply = Comment.objects.get(text='Ответ')
+        self.assertEqual(reply.parent, root)
+        self.assertEqual(reply.depth, 1)
+        self.assertTrue(reply.path.startswith(root.path))
+
+    @override_settings(COMMENTS_LIMIT=2)
+    def test_comments_are_paginated_by_cursor(self):
+        """Комментарии разбиты на страницы по курсору пути."""
+        root = self.comment('1')
+        self.comment('1.1', root)
+        self.comment('1.2', root)
+        url = reverse('posts:post_detail',
+                      kwargs={'post_id': CommentTreeTests.post.pk})
+        response = self.authorized_client.get(url)
+        next_comment = response.context['next_comment']
+        self.assertEqual(len(response.context['comments']), 2)
+        response = self.authorized_client.get(url, {'after': next_comment})
+        self.assertEqual([comment.text for comment
+                          in response.context['comments']], ['1.2'])
+        self.assertIsNone(response.context['next_comment'])
@@ -0,0 +1,162 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import deletion
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class DeletionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author = User.objects.create_user(username='leaving-author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Удаляемая группа',
+            slug='deleted-group',
+            description='Для тестирования удаления'
+        )
+        self.posts = [
+            Post.objects.create(author=self.author,
+                                group=self.group,
+                                text=f'Пост {number}')
+            for number in range(5)
+        ]
+        Comment.objects.create(post=self.posts[0], author=self.reader,
+                               text='Комментарий читателя')
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_deleted_user_is_hidden_immediately(self):
+        """Посты удаленного пользователя пропадают до фоновой очистки."""
+        deletion.delete_user(self.author)
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 5)
+        self.assertFalse(Post.objects.visible().exists())
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'leaving-author'})
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get(
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.posts[0].pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_deactivated_user_posts_stay_visible(self):
+        """Деактивация без удаления не скрывает посты автора."""
+        self.author.is_active = False
+        self.author.save()
+        self.assertEqual(Post.objects.visible().count(), 5)
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'leaving-author'})
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_group_link_is_hidden(self):
+        """На страницах постов нет ссылки на удаленную группу."""
+        group_url = reverse('posts:group_list',
+                            kwargs={'slug': 'deleted-group'})
+        deletion.delete_group(self.group)
+        for url in (reverse('posts:index'),
+                    reverse('posts:post_detail',
+                            kwargs={'post_id': self.posts[0].pk})):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotContains(response, group_url)
+
+    def test_admin_cannot_delete_directly(self):
+        """Админка удаляет только мягко, без стандартного удаления."""
+        admin = User.objects.create_superuser('admin', 'admin@example.com',
+                                              'password')
+        client = Client()
+        client.force_login(admin)
+        for model, obj in (('post', self.posts[0]), ('group', self.group),
+                           ('user', self.author)):
+            app = 'auth' if model == 'user' else 'posts'
+            with self.subTest(model=model):
+                response = client.get(
+                    reverse(f'admin:{app}_{model}_changelist')
+                )
+                actions = response.context['action_form'].fields['action']
+                self.assertNotIn('delete_selected',
+                                 dict(actions.choices))
+                response = client.get(
+                    reverse(f'admin:{app}_{model}_delete', args=(obj.pk,))
+                )
+                self.assertEqual(response.status_code, 403)
+
+    def test_purge_removes_user_data_in_batches(self):
+        """Очистка удаляет пользователя, его посты, комментарии и подписки."""
+        Comment.objects.create(post=self.posts[1], author=self.author,
+                               text='Комментарий автора')
+        deletion.delete_user(self.author)
+        _, _, users = deletion.purge_deleted(batch_size=2)
+        self.assertEqual(users, 1)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+
+    def test_purge_detaches_posts_from_deleted_group(self):
+        """Посты удаленной группы остаются, но теряют группу."""
+        deletion.delete_group(self.group)
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'deleted-group'})
+        )
+        self.assertEqual(response.status_code, 404)
+        _, groups, _ = deletion.purge_deleted(batch_size=2)
+        self.assertEqual(groups, 1)
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.filter(group__isnull=True).count(), 5)
+
+    def test_purge_releases_unreferenced_images(self):
+        """Картинка удаляется, когда на нее не ссылается ни один пост."""
+        post = Post.objects.create(
+            author=self.reader,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(name='image.gif', content=SMALL_GIF,
+                                     content_type='image/gif')
+        )
+        storage = post.image.storage
+        deletion.delete_post(post)
+        self.assertTrue(storage.exists(post.image.name))
+        posts, _, _ = deletion.purge_deleted()
+        self.assertEqual(posts, 1)
+        self.assertFalse(storage.exists(post.image.name))
+
+    def test_purge_removes_comment_thread_in_batches(self):
+        """Ветка ответов удаляется пачками раньше самого поста."""
+        post = self.posts[2]
+        parent = None
+        for number in range(5):
+            parent = Comment.objects.create(post=post, author=self.reader,
+                                            parent=parent,
+                                            text=f'Ответ {number}')
+        deletion.delete_post(post)
+        posts, _, _ = deletion.purge_deleted(batch_size=2)
+        self.assertEqual(posts, 1)
+        self.assertFalse(Comment.objects.filter(post_id=post.pk).exists())
+        self.assertEqual(Comment.objects.count(), 1)
@@ -0,0 +1,86 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, DataExport, Post
+
+User = get_user_model()
+
+TEMP_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_ROOT, EXPORT_ROOT=TEMP_ROOT,
+                   EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='exporting-user')
+        for number in range(3):
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(name='image.gif', content=SMALL_GIF,
+                                     content_type='image/gif')
+        )
+        Comment.objects.create(post=cls.post, author=cls.user,
+                               text='Комментарий')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ExportTests.user)
+
+    def check_archive(self, content):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            posts = archive.read('posts.jsonl').decode().splitlines()
+            comments = archive.read('comments.jsonl').decode().splitlines()
+            image_names = [name for name in archive.namelist()
+                           if name.startswith('images/')]
+            image = archive.read(image_names[0])
+        self.assertEqual(len(posts), 4)
+        self.assertEqual(json.loads(comments[0])['text'], 'Комментарий')
+        self.assertEqual(image, SMALL_GIF)
+
+    def test_small_export_is_streamed(self):
+        """Небольшой архив отдается потоком сразу."""
+        response = self.client.post(reverse('posts:export_data'))
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        self.check_archive(b''.join(chunks))
+
+    @override_settings(EXPORT_STREAM_LIMIT=1)
+    def test_large_export_is_prepared_in_background(self):
+        """Большой архив готовит команда prepare_exports."""
+        self.client.post(reverse('posts:export_data'))
+        data_export = DataExport.objects.get(user=ExportTests.user)
+        self.assertEqual(data_export.status, DataExport.PENDING)
+        call_command('prepare_exports', stdout=io.StringIO())
+        data_export.refresh_from_db()
+        self.assertEqual(data_export.status, DataExport.READY)
+        response = self.client.get(
+            reverse('posts:export_download',
+                    kwargs={'export_id': data_export.pk})
+        )
+        self.check_archive(b''.join(response.streaming_content))
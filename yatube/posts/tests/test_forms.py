@@ -1,3 +1,5 @@
+import hashlib
+import os
 import shutil
 import tempfile
 
@@ -14,6 +16,11 @@ User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
+def get_stored_name(content, extension):
+    content_hash = hashlib.sha256(content).hexdigest()
+    return f'posts/{content_hash[:2]}/{content_hash}{extension}'
+
+
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostFormsTest(TestCase):
     @classmethod
@@ -74,7 +81,7 @@ class PostFormsTest(TestCase):
             Post.objects.filter(
                 text=form_data['text'],
                 group=form_data['group'],
-                image='posts/' + form_data['image'].name
+                image=get_stored_name(gif, '.gif')
             ).exists()
         )
 
@@ -111,7 +118,7 @@ class PostFormsTest(TestCase):
             Post.objects.filter(
                 text=form_data['text'],
                 group=form_data['group'],
-                image='posts/' + form_data['image'].name
+                image=get_stored_name(gif, '.gif')
             ).exists()
         )
 
@@ -130,3 +137,64 @@ class PostFormsTest(TestCase):
         )
         self.assertEqual(post.comments.count(), comments_count + 1)
         self.assertTrue(post.comments.filter(text=form_data['text']).exists())
+
+    def test_identical_images_share_file(self):
+        """Одинаковые картинки хранятся в одном файле."""
+        content = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00'
+            b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+            b'\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        for name in ('first.gif', 'second.GIF'):
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                data={
+                    'text': f'Пост с картинкой {name}',
+                    'image': SimpleUploadedFile(name=name,
+                                                content=content,
+                                                content_type='image/gif'),
+                },
+            )
+        stored_name = get_stored_name(content, '.gif')
+        self.assertEqual(Post.objects.filter(image=stored_name).count(), 2)
+        directory = os.path.join(TEMP_MEDIA_ROOT, os.path.dirname(stored_name))
+        self.assertEqual(os.listdir(directory),
+                         [os.path.basename(stored_name)])
+
+    def test_upload_rejects_fake_image(self):
+        """Файл, который не является картинкой, отбрасывается при загрузке."""
+        posts_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(name='fake.gif',
+                                      content=b'<?php echo "not a gif";',
+                                      content_type='image/gif')
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с поддельной картинкой', 'image': uploaded},
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+        self.assertTrue(response.context['form'].has_error('image'))
+
+    @override_settings(UPLOAD_MAX_REQUEST_SIZE=1024)
+    def test_upload_size_limit(self):
+        """Загрузка больше лимита отбрасывается."""
+        posts_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(name='big.gif',
+                                      content=b'GIF89a' + b'\x00' * 4096,
+                                      content_type='image/gif')
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с большой картинкой', 'image': uploaded},
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+        self.assertTrue(response.context['form'].has_error('image'))
+
+    def test_post_create_checks_csrf(self):
+        """Создание поста с загрузкой по-прежнему требует CSRF-токен."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'),
+                               data={'text': 'Пост без токена'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.filter(text='Пост без токена').exists())
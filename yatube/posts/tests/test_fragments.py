@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_LIMIT=3)
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='fragment-author')
+        cls.reader = User.objects.create_user(username='fragment-reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='fragments', description='Описание'
+        )
+        for number in range(7):
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Пост номер {number}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedFragmentTests.reader)
+
+    def load_all(self, client, url):
+        texts = []
+        cursor = None
+        while True:
+            params = {'before': cursor} if cursor else {}
+            data = client.get(url, params).json()
+            self.assertNotIn('<html', data['html'])
+            texts += [text for text in data['html'].split('<p>')[1:]]
+            cursor = data['next_cursor']
+            if cursor is None:
+                return texts
+
+    def test_fragments_walk_whole_feed(self):
+        """Фрагменты отдают ленту пачками по курсору до конца."""
+        author = FeedFragmentTests.author
+        urls = (
+            (self.guest_client, reverse('posts:index_fragment')),
+            (self.guest_client, reverse(
+                'posts:group_fragment',
+                kwargs={'slug': FeedFragmentTests.group.slug},
+            )),
+            (self.guest_client, reverse(
+                'posts:profile_fragment',
+                kwargs={'username': author.username},
+            )),
+            (self.authorized_client, reverse('posts:follow_fragment')),
+        )
+        for client, url in urls:
+            with self.subTest(url=url):
+                texts = self.load_all(client, url)
+                self.assertEqual(len(texts), 7)
+                self.assertTrue(texts[0].startswith('Пост номер 6'))
+                self.assertTrue(texts[-1].startswith('Пост номер 0'))
+
+    def test_page_links_fragment_cursor(self):
+        """Страница ленты передает скрипту курсор последнего поста."""
+        response = self.guest_client.get(reverse('posts:index'))
+        last_post = response.context['page_obj'].object_list[-1]
+        self.assertContains(
+            response,
+            f'data-cursor="{last_post.pub_date.isoformat()}_{last_post.pk}"'
+        )
+        self.assertContains(response, reverse('posts:index_fragment'))
+
+    def test_posts_with_same_date_are_not_skipped(self):
+        """Посты с одинаковой датой не теряются на границе пачек."""
+        Post.objects.update(pub_date=Post.objects.first().pub_date)
+        texts = self.load_all(self.guest_client,
+                              reverse('posts:index_fragment'))
+        self.assertEqual(len(texts), 7)
+        self.assertTrue(texts[0].startswith('Пост номер 6'))
+        self.assertTrue(texts[-1].startswith('Пост номер 0'))
+
+    def test_fragment_is_cached(self):
+        """Ответ фрагмента для гостя берется из кэша."""
+        url = reverse('posts:index_fragment')
+        first = self.guest_client.get(url).json()
+        Post.objects.create(author=FeedFragmentTests.author,
+                            text='Свежий пост')
+        self.assertEqual(self.guest_client.get(url).json(), first)
+
+    def test_bad_cursor(self):
+        """Некорректный курсор дает 404."""
+        for before in ('abc', '2021-01-01T00:00:00', 'abc_1',
+                       '2021-01-01T00:00:00_x'):
+            with self.subTest(before=before):
+                response = self.guest_client.get(
+                    reverse('posts:index_fragment'), {'before': before}
+                )
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import likes
+from posts.forms import PostForm
+from posts.models import Like, LikeCounterShard, Post
+
+User = get_user_model()
+
+
+class LikeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='liked-author')
+        cls.readers = [User.objects.create_user(username=f'reader-{number}')
+                       for number in range(3)]
+        cls.post = Post.objects.create(author=cls.author, text='Хороший пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(LikeTests.readers[0])
+
+    def test_like_is_unique_per_user(self):
+        """Повторный лайк не увеличивает счетчик."""
+        post = LikeTests.post
+        url = reverse('posts:post_like', kwargs={'post_id': post.pk})
+        self.authorized_client.post(url)
+        self.authorized_client.post(url)
+        self.assertEqual(Like.objects.filter(post=post).count(), 1)
+        self.assertEqual(likes.get_likes_count(post), 1)
+        self.authorized_client.post(
+            reverse('posts:post_unlike', kwargs={'post_id': post.pk})
+        )
+        self.assertEqual(likes.get_likes_count(post), 0)
+
+    def test_merge_folds_shards_into_post(self):
+        """Сведение переносит счетчики в Post.likes_count."""
+        for reader in LikeTests.readers:
+            likes.like_post(reader, LikeTests.post)
+        likes.unlike_post(LikeTests.readers[0], LikeTests.post)
+        self.assertEqual(likes.merge_counters(), 1)
+        post = Post.objects.get(pk=LikeTests.post.pk)
+        self.assertEqual(post.likes_count, 2)
+        self.assertFalse(LikeCounterShard.objects.exists())
+        self.assertEqual(likes.get_likes_count(post), 2)
+
+    def test_feed_reads_denormalized_count(self):
+        """Лента показывает сведенный счетчик без чтения таблицы лайков."""
+        Post.objects.filter(pk=LikeTests.post.pk).update(likes_count=42)
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Нравится: 42')
+
+    def test_like_requires_post(self):
+        """GET-запрос не ставит лайк."""
+        url = reverse('posts:post_like', kwargs={'post_id': LikeTests.post.pk})
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Like.objects.exists())
+
+    def test_edit_keeps_merged_count(self):
+        """Правка поста не затирает сведенный счетчик лайков."""
+        post = Post.objects.get(pk=LikeTests.post.pk)
+        Post.objects.filter(pk=post.pk).update(likes_count=7)
+        form = PostForm({'text': 'Исправленный пост'}, instance=post)
+        self.assertTrue(form.is_valid())
+        form.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный пост')
+        self.assertEqual(post.likes_count, 7)
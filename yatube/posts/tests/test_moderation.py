@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import moderation
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='author')
+        cls.moderator = User.objects.create_superuser(
+            username='moderator', email='moderator@yatube.ru',
+            password='password',
+        )
+        cls.old_group = Group.objects.create(
+            title='Старая группа', slug='old', description='Старая'
+        )
+        cls.new_group = Group.objects.create(
+            title='Новая группа', slug='new', description='Новая'
+        )
+        for number in range(5):
+            Post.objects.create(author=cls.spammer, group=cls.old_group,
+                                text=f'Купите слона {number}')
+        cls.post = Post.objects.create(author=cls.author,
+                                       group=cls.old_group,
+                                       text='Обычный пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(ModerationTests.moderator)
+
+    def get_group_count(self, group):
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': group.slug})
+        )
+        return response.context['page_obj'].paginator.count
+
+    def test_move_posts_in_batches(self):
+        """Перенос пачками обновляет посты и кэшированные счетчики групп."""
+        self.assertEqual(self.get_group_count(ModerationTests.old_group), 6)
+        progress = []
+        posts = moderation.filter_posts(text='слона')
+        with CaptureQueriesContext(connection) as queries:
+            updated = moderation.move_posts(
+                posts, ModerationTests.new_group, batch_size=2,
+                progress=progress.append,
+            )
+        self.assertEqual(updated, 5)
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(self.get_group_count(ModerationTests.old_group), 1)
+        self.assertEqual(self.get_group_count(ModerationTests.new_group), 5)
+
+    def test_hidden_posts_leave_feeds(self):
+        """Скрытый пост пропадает из ленты и со своей страницы."""
+        detail_url = reverse('posts:post_detail',
+                             kwargs={'post_id': ModerationTests.post.pk})
+        self.assertEqual(self.guest_client.get(detail_url).status_code, 200)
+        cache.clear()
+        moderation.hide_posts(
+            moderation.filter_posts(author=ModerationTests.author)
+        )
+        self.assertEqual(self.guest_client.get(detail_url).status_code, 404)
+        self.assertEqual(Post.objects.visible().count(), 5)
+        moderation.show_posts(Post.objects.all())
+        self.assertEqual(Post.objects.visible().count(), 6)
+
+    def test_admin_actions(self):
+        """Действия админки переносят и удаляют выбранные посты."""
+        url = reverse('admin:posts_post_changelist')
+        spam = list(Post.objects.filter(author=ModerationTests.spammer)
+                    .values_list('pk', flat=True))
+        self.admin_client.post(url, {
+            'action': 'move_to_group',
+            '_selected_action': spam,
+            'group': ModerationTests.new_group.pk,
+        })
+        self.assertEqual(
+            Post.objects.filter(group=ModerationTests.new_group).count(), 5
+        )
+        self.admin_client.post(url, {
+            'action': 'soft_delete',
+            '_selected_action': spam,
+        })
+        self.assertEqual(Post.objects.visible().count(), 1)
+
+    def test_command_reports_progress(self):
+        """Команда фильтрует посты и печатает ход обработки."""
+        out = StringIO()
+        call_command('moderate_posts', 'delete', '--author', 'spammer',
+                     '--batch-size', '3', stdout=out)
+        self.assertIn('Обработано постов: 3 из 5', out.getvalue())
+        self.assertIn('Обработано постов: 5', out.getvalue())
+        self.assertEqual(Post.objects.filter(is_deleted=True).count(), 5)
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import notifications
+from posts.models import Follow, Notification, NotificationSettings, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='notifying-author')
+        cls.followers = [
+            User.objects.create_user(username=f'follower-{number}',
+                                     email=f'follower-{number}@example.com')
+            for number in range(3)
+        ]
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+        NotificationSettings.objects.create(user=cls.followers[2],
+                                            new_posts=False)
+
+    def test_post_create_does_not_notify_synchronously(self):
+        """Создание поста не создает уведомлений и не отправляет писем."""
+        client = Client()
+        client.force_login(NotificationTests.author)
+        client.post(reverse('posts:post_create'), data={'text': 'Новый'})
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_fan_out_respects_preferences(self):
+        """Уведомления получают только подписчики, не отключившие их."""
+        Post.objects.create(author=NotificationTests.author, text='Пост')
+        posts, created = notifications.fan_out()
+        self.assertEqual((posts, created), (1, 2))
+        self.assertEqual(notifications.fan_out(), (0, 0))
+
+    def test_digest_batches_posts_over_one_connection(self):
+        """Один дайджест на пользователя, одно соединение на рассылку."""
+        for number in range(3):
+            Post.objects.create(author=NotificationTests.author,
+                                text=f'Пост {number}')
+        notifications.fan_out()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend'
+                        '.open') as opened:
+            messages, sent, _ = notifications.send_digests(
+                NotificationSettings.DAILY, batch_size=1
+            )
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual((messages, sent), (2, 6))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('Пост 2', mail.outbox[0].body)
+        self.assertFalse(
+            Notification.objects.filter(sent__isnull=True).exists()
+        )
+
+    def test_digest_skips_hidden_posts_without_extra_queries(self):
+        """Скрытые посты не попадают в письмо, но уведомления закрываются."""
+        posts = [Post.objects.create(author=NotificationTests.author,
+                                     text=f'Пост {number}')
+                 for number in range(3)]
+        notifications.fan_out()
+        Post.objects.filter(pk=posts[0].pk).update(is_hidden=True)
+        with self.assertNumQueries(4):
+            messages, sent, _ = notifications.send_digests(
+                NotificationSettings.DAILY
+            )
+        self.assertEqual((messages, sent), (2, 6))
+        self.assertNotIn('Пост 0', mail.outbox[0].body)
+        self.assertIn('Пост 1', mail.outbox[0].body)
+
+    def test_fan_out_in_chunks(self):
+        """Подписчики перебираются пачками без пропусков."""
+        post = Post.objects.create(author=NotificationTests.author,
+                                   text='Пост')
+        created = notifications.notify_subscribers(
+            post.pk, NotificationTests.author.pk, batch_size=1
+        )
+        self.assertEqual(created, 2)
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)),
+            {follower.pk for follower in NotificationTests.followers[:2]}
+        )
+
+    def test_opted_out_user_gets_no_digest(self):
+        """После отключения рассылки накопленные уведомления не уходят."""
+        Post.objects.create(author=NotificationTests.author, text='Пост')
+        notifications.fan_out()
+        NotificationSettings.objects.create(
+            user_id=NotificationTests.followers[0].pk, new_posts=False
+        )
+        recipients = notifications.get_recipients(NotificationSettings.DAILY)
+        self.assertEqual(list(recipients), [NotificationTests.followers[1]])
+        messages, _, _ = notifications.send_digests(
+            NotificationSettings.DAILY
+        )
+        self.assertEqual(messages, 1)
+        self.assertEqual(notifications.prune_sent(), 1)
+        self.assertFalse(Notification.objects.filter(
+            user=NotificationTests.followers[0]
+        ).exists())
+
+    def test_settings_page_saves_preferences(self):
+        """Страница настроек сохраняет частоту писем."""
+        follower = NotificationTests.followers[0]
+        client = Client()
+        client.force_login(follower)
+        url = reverse('posts:notification_settings')
+        self.assertEqual(client.get(url).status_code, 200)
+        client.post(url, data={'new_posts': 'on',
+                               'frequency': NotificationSettings.HOURLY})
+        self.assertEqual(follower.notification_settings.frequency,
+                         NotificationSettings.HOURLY)
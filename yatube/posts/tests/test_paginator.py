@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginator import CachedCountPaginator, get_count_key
+
+User = get_user_model()
+
+
+class CachedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='paginator-author')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}') for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        """Число постов берется из кэша без запроса COUNT."""
+        key = get_count_key('author', CachedCountPaginatorTests.author.pk)
+        posts = Post.objects.filter(author=CachedCountPaginatorTests.author)
+        self.assertEqual(CachedCountPaginator(posts, 2, key).count, 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(posts, 2, key).count, 5)
+        Post.objects.create(author=CachedCountPaginatorTests.author,
+                            text='Новый пост')
+        self.assertEqual(CachedCountPaginator(posts, 2, key).count, 6)
+
+    def test_follow_count_is_invalidated(self):
+        """Подписка и отписка сбрасывают число постов в ленте подписок."""
+        reader = User.objects.create_user(username='paginator-reader')
+        client = Client()
+        client.force_login(reader)
+        author = CachedCountPaginatorTests.author
+        follow_url = reverse('posts:follow_index')
+
+        def get_count():
+            response = client.get(follow_url)
+            return response.context['page_obj'].paginator.count
+
+        self.assertEqual(get_count(), 0)
+        client.get(reverse('posts:profile_follow',
+                           kwargs={'username': author.username}))
+        self.assertEqual(get_count(), 5)
+        client.get(reverse('posts:profile_unfollow',
+                           kwargs={'username': author.username}))
+        self.assertEqual(get_count(), 0)
+
+    def test_elided_page_range(self):
+        """Список страниц сокращается многоточием."""
+        paginator = CachedCountPaginator(range(1000), 10)
+        ellipsis = CachedCountPaginator.ELLIPSIS
+        self.assertEqual(
+            paginator.get_page(50).elided_page_range,
+            [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100]
+        )
+        self.assertEqual(
+            paginator.get_page(1).elided_page_range,
+            [1, 2, 3, ellipsis, 100]
+        )
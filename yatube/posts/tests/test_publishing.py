@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.forms import PUBLISH_AT_FORMAT
+from posts.models import Follow, Post
+from posts.publishing import publish_due_posts
+
+User = get_user_model()
+
+
+class ScheduledPublicationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='scheduler')
+        cls.reader = User.objects.create_user(username='waiting-reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(ScheduledPublicationTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(ScheduledPublicationTests.reader)
+
+    def schedule(self, text, delta=timedelta(hours=1)):
+        publish_at = timezone.now() + delta
+        return self.author_client.post(reverse('posts:post_create'), {
+            'text': text,
+            'publish_at': publish_at.strftime(PUBLISH_AT_FORMAT),
+        })
+
+    def get_feed_count(self, client, name):
+        response = client.get(reverse(name))
+        return response.context['page_obj'].paginator.count
+
+    def test_scheduled_post_is_hidden_until_published(self):
+        """Отложенный пост появляется в лентах только после публикации."""
+        self.assertEqual(self.get_feed_count(self.reader_client,
+                                             'posts:index'), 0)
+        self.assertEqual(self.get_feed_count(self.reader_client,
+                                             'posts:follow_index'), 0)
+        self.schedule('Пост на завтра')
+        post = Post.objects.get(text='Пост на завтра')
+        self.assertFalse(post.is_published)
+        self.assertFalse(Post.objects.visible().exists())
+        response = self.author_client.get(
+            reverse('posts:profile', kwargs={'username': 'scheduler'})
+        )
+        self.assertContains(response, 'Запланированные посты')
+        self.assertEqual(publish_due_posts(), 0)
+        later = timezone.now() + timedelta(hours=2)
+        self.assertEqual(publish_due_posts(now=later), 1)
+        post.refresh_from_db()
+        self.assertTrue(post.is_published)
+        self.assertEqual(post.pub_date, post.publish_at)
+        self.assertEqual(self.get_feed_count(self.reader_client,
+                                             'posts:index'), 1)
+        self.assertEqual(self.get_feed_count(self.reader_client,
+                                             'posts:follow_index'), 1)
+
+    def test_publish_at_must_be_in_future(self):
+        """Время публикации в прошлом не принимается."""
+        response = self.schedule('Опоздавший пост', timedelta(hours=-1))
+        self.assertFormError(response, 'form', 'publish_at',
+                             'Время публикации должно быть в будущем.')
+        self.assertFalse(Post.objects.exists())
+
+    def test_clearing_publish_at_publishes_now(self):
+        """Без времени публикации отложенный пост выходит сразу."""
+        self.schedule('Передумал ждать')
+        post = Post.objects.get()
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Передумал ждать', 'publish_at': ''},
+        )
+        post.refresh_from_db()
+        self.assertTrue(post.is_published)
+        self.assertIsNone(post.publish_at)
+        self.assertEqual(Post.objects.visible().count(), 1)
+
+    def test_command_publishes_due_posts(self):
+        """Команда публикует посты, время которых наступило."""
+        self.schedule('Почти готов')
+        Post.objects.update(publish_at=timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command('publish_scheduled', stdout=out)
+        self.assertIn('Опубликовано постов: 1', out.getvalue())
+        self.assertEqual(Post.objects.visible().count(), 1)
+
+    def test_publishing_rebuilds_archive_of_publish_month(self):
+        """Публикация пересобирает архив месяца publish_at."""
+        self.schedule('Пост задним числом')
+        publish_at = timezone.now() - timedelta(days=200)
+        Post.objects.update(publish_at=publish_at)
+        with mock.patch('posts.archive.rebuild_pages') as rebuild_pages:
+            self.assertEqual(publish_due_posts(), 1)
+        publish_at = timezone.localtime(publish_at)
+        self.assertIn(
+            ('profile', 'scheduler', publish_at.year, publish_at.month),
+            rebuild_pages.call_args[0][0]
+        )
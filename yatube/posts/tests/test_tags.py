@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, PostTag, Tag
+from posts.tags import extract_tags, sync_tags
+
+User = get_user_model()
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='tagging-user')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TagTests.user)
+
+    def test_extract_tags(self):
+        """Теги нормализуются и не путаются с HTML-сущностями."""
+        self.assertEqual(extract_tags('#Django и #django, &#39; a#b #питон'),
+                         {'django', 'питон'})
+
+    def test_too_long_tag_is_skipped(self):
+        """Тег длиннее 100 символов пропускается, а не обрезается."""
+        self.assertEqual(extract_tags(f'#{"a" * 101} #{"b" * 100}'),
+                         {'b' * 100})
+
+    def test_post_create_and_edit_sync_tags(self):
+        """Теги пишутся при создании и обновляются при редактировании."""
+        self.authorized_client.post(reverse('posts:post_create'),
+                                    data={'text': 'Пост про #python #django'})
+        post = Post.objects.get()
+        self.assertEqual(
+            set(post.post_tags.values_list('tag__name', flat=True)),
+            {'python', 'django'}
+        )
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Теперь только #python'}
+        )
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['python']
+        )
+
+    @override_settings(POSTS_LIMIT=2)
+    def test_tag_feed_is_keyset_paginated(self):
+        """Лента тега листается курсором по убыванию pk поста."""
+        posts = [Post.objects.create(author=TagTests.user,
+                                     text=f'Пост {number} #feed')
+                 for number in range(3)]
+        call_command('backfill_tags', workers=1, batch_size=2,
+                     stdout=StringIO())
+        self.assertEqual(PostTag.objects.count(), 3)
+        url = reverse('posts:tag_posts', kwargs={'name': 'Feed'})
+        response = self.authorized_client.get(url)
+        self.assertEqual(list(response.context['posts']),
+                         [posts[2], posts[1]])
+        self.assertContains(
+            response,
+            f'href="{reverse("posts:tag_posts", kwargs={"name": "feed"})}"'
+        )
+        response = self.authorized_client.get(
+            url, {'before': response.context['next_post']}
+        )
+        self.assertEqual(list(response.context['posts']), [posts[0]])
+        self.assertIsNone(response.context['next_post'])
+        self.assertTrue(Tag.objects.filter(name='feed').exists())
+
+    def test_tag_feed_rejects_invalid_cursor(self):
+        """Нечисловой курсор ленты тега дает 404."""
+        post = Post.objects.create(author=TagTests.user, text='Пост #python')
+        sync_tags(post)
+        url = reverse('posts:tag_posts', kwargs={'name': 'python'})
+        response = self.authorized_client.get(url, {'before': post.pk + 1})
+        self.assertEqual(list(response.context['posts']), [post])
+        for before in ('abc', '-1', '²'):
+            with self.subTest(before=before):
+                response = self.authorized_client.get(url, {'before': before})
+                self.assertEqual(response.status_code, 404)
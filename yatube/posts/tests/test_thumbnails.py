@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import Post
+from posts.thumbnails import (FEED_THUMBNAIL_GEOMETRY, FEED_THUMBNAIL_OPTIONS,
+                              clear_prefetched, prefetch_thumbnails)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PrefetchThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00'
+            b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+            b'\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        cls.user = User.objects.create_user(username='thumbnail-user')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                text=f'Пост с картинкой {i}',
+                image=SimpleUploadedFile(name=f'thumb{i}.gif',
+                                         content=small_gif,
+                                         content_type='image/gif')
+            )
+            for i in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def tearDown(self):
+        clear_prefetched()
+
+    def test_prefetch_single_query(self):
+        """Записи миниатюр страницы загружаются одним запросом."""
+        posts = PrefetchThumbnailsTests.posts
+        for post in posts:
+            get_thumbnail(post.image, FEED_THUMBNAIL_GEOMETRY,
+                          **FEED_THUMBNAIL_OPTIONS)
+        cache.clear()
+        with self.assertNumQueries(1):
+            prefetch_thumbnails(post.image for post in posts)
+        with self.assertNumQueries(0):
+            for post in posts:
+                thumbnail = get_thumbnail(post.image, FEED_THUMBNAIL_GEOMETRY,
+                                          **FEED_THUMBNAIL_OPTIONS)
+                self.assertTrue(thumbnail.url)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Post, PostScore
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='trending-user')
+        cls.quiet_post = Post.objects.create(author=cls.user,
+                                             text='Пост без обсуждения')
+        cls.hot_post = Post.objects.create(author=cls.user,
+                                           text='Обсуждаемый пост')
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_comment_updates_rank(self):
+        """Каждый комментарий увеличивает рейтинг поста."""
+        post = TrendingTests.hot_post
+        Comment.objects.create(post=post, author=TrendingTests.user,
+                               text='Первый')
+        first_rank = PostScore.objects.get(post=post).rank
+        Comment.objects.create(post=post, author=TrendingTests.user,
+                               text='Второй')
+        self.assertAlmostEqual(PostScore.objects.get(post=post).rank,
+                               first_rank + 1, places=3)
+
+    def test_old_activity_decays(self):
+        """Вклад комментария затухает вдвое за период полураспада."""
+        now = timezone.now()
+        half_life = timedelta(seconds=settings.TRENDING_HALF_LIFE)
+        rank = trending.add_to_rank(float('-inf'), now)
+        self.assertAlmostEqual(trending.get_score(rank, now), 1)
+        self.assertAlmostEqual(trending.get_score(rank, now + half_life),
+                               0.5)
+
+    def test_trending_page(self):
+        """На странице популярного только обсуждаемые посты."""
+        Comment.objects.create(post=TrendingTests.hot_post,
+                               author=TrendingTests.user,
+                               text='Комментарий')
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'],
+                         [TrendingTests.hot_post])
+
+    def test_command_refreshes_cache(self):
+        """Кэш популярного заполняет только команда refresh_trending."""
+        Comment.objects.create(post=TrendingTests.hot_post,
+                               author=TrendingTests.user,
+                               text='Комментарий')
+        self.guest_client.get(reverse('posts:trending'))
+        self.assertIsNone(cache.get(trending.TRENDING_CACHE_KEY))
+        call_command('refresh_trending', stdout=StringIO())
+        self.assertEqual(cache.get(trending.TRENDING_CACHE_KEY),
+                         [TrendingTests.hot_post])
+
+    def test_invalidate_drops_only_affected_posts(self):
+        """invalidate_trending убирает из кэша только затронутые посты."""
+        for post in (TrendingTests.hot_post, TrendingTests.quiet_post):
+            Comment.objects.create(post=post, author=TrendingTests.user,
+                                   text='Комментарий')
+        trending.refresh_trending()
+        trending.invalidate_trending([TrendingTests.quiet_post.pk])
+        self.assertEqual(cache.get(trending.TRENDING_CACHE_KEY),
+                         [TrendingTests.hot_post])
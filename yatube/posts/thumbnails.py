@@ -0,0 +1,95 @@
+from threading import local
+
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as default_settings, settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE, KVStore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+FEED_THUMBNAIL_GEOMETRY = '1440x508'
+FEED_THUMBNAIL_OPTIONS = {
+    'crop': 'center',
+    'upscale': True,
+}
+
+_prefetched = local()
+
+
+class PrefetchingKVStore(KVStore):
+    """Хранилище sorl-thumbnail, которое сначала читает предзагруженные
+    значения текущего запроса."""
+
+    def _get_raw(self, key):
+        values = getattr(_prefetched, 'values', None)
+        if values is not None and key in values:
+            value = values[key]
+            return None if value == EMPTY_VALUE else value
+        return super()._get_raw(key)
+
+    def _set_raw(self, key, value):
+        super()._set_raw(key, value)
+        values = getattr(_prefetched, 'values', None)
+        if values is not None:
+            values[key] = value
+
+    def _delete_raw(self, *keys):
+        super()._delete_raw(*keys)
+        values = getattr(_prefetched, 'values', None)
+        if values is not None:
+            for key in keys:
+                values.pop(key, None)
+
+
+def get_thumbnail_options(options):
+    """Повторяет подготовку опций из ThumbnailBackend.get_thumbnail."""
+    options = dict(options)
+    backend = default.backend
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def get_thumbnail_key(image, geometry, options):
+    source = ImageFile(image)
+    name = default.backend._get_thumbnail_filename(source, geometry, options)
+    return add_prefix(ImageFile(name, default.storage).key)
+
+
+def prefetch_thumbnails(images, geometry=FEED_THUMBNAIL_GEOMETRY,
+                        **options):
+    """Загружает записи миниатюр для всех картинок одним get_many.
+
+    Промахи кэша дочитываются из базы одним запросом IN. Тег thumbnail
+    затем получает их из памяти через PrefetchingKVStore.
+    """
+    if settings.THUMBNAIL_PRESERVE_FORMAT:
+        return
+    options = get_thumbnail_options(options or FEED_THUMBNAIL_OPTIONS)
+    keys = [get_thumbnail_key(image, geometry, options)
+            for image in images if image]
+    if not keys:
+        return
+    kv_cache = KVStore().cache
+    values = kv_cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict(KVStoreModel.objects.filter(key__in=missing)
+                     .values_list('key', 'value'))
+        loaded = {key: found.get(key, EMPTY_VALUE) for key in missing}
+        kv_cache.set_many(loaded, settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(loaded)
+    if getattr(_prefetched, 'values', None) is None:
+        _prefetched.values = {}
+    _prefetched.values.update(values)
+
+
+@receiver(request_finished)
+def clear_prefetched(**kwargs):
+    _prefetched.values = None
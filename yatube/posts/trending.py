@@ -0,0 +1,104 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Post, PostScore
+
+TRENDING_CACHE_KEY = 'trending_posts'
+SCORE_EPOCH = datetime(2021, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_age(moment):
+    """Время от SCORE_EPOCH в периодах полураспада TRENDING_HALF_LIFE."""
+    seconds = (moment - SCORE_EPOCH).total_seconds()
+    return seconds / settings.TRENDING_HALF_LIFE
+
+
+def add_to_rank(rank, moment):
+    """Рейтинг после еще одного комментария в момент moment.
+
+    Рейтинг хранит log2(Σ 2 ** age) по всем комментариям, поэтому
+    комментарии можно добавлять в любом порядке, а вес каждого падает
+    вдвое за период полураспада без пересчета старых строк.
+    """
+    age = get_age(moment)
+    high, low = max(rank, age), min(rank, age)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def get_score(rank, now):
+    """Затухший рейтинг на момент now: сумма весов комментариев."""
+    return 2 ** (rank - get_age(now))
+
+
+def record_activity(post_id, moment):
+    with transaction.atomic():
+        score = (PostScore.objects.select_for_update()
+                 .filter(post_id=post_id).first())
+        if score is None:
+            try:
+                with transaction.atomic():
+                    PostScore.objects.create(post_id=post_id,
+                                             rank=get_age(moment))
+                return
+            except IntegrityError:
+                score = (PostScore.objects.select_for_update()
+                         .get(post_id=post_id))
+        score.rank = add_to_rank(score.rank, moment)
+        score.save(update_fields=('rank',))
+
+
+def get_min_rank(now):
+    """Рейтинг поста с одним комментарием в начале окна TRENDING_WINDOW."""
+    return get_age(now - timedelta(seconds=settings.TRENDING_WINDOW))
+
+
+def get_top_posts(now=None):
+    """Популярные видимые посты одним запросом по индексу рейтинга."""
+    return list(Post.objects.visible()
+                .filter(score__rank__gte=get_min_rank(now or timezone.now()))
+                .select_related('author', 'group')
+                .order_by('-score__rank')[:settings.TRENDING_LIMIT])
+
+
+def refresh_trending():
+    """Кладет в кэш список популярного; вызывается командой
+    refresh_trending."""
+    posts = get_top_posts()
+    cache.set(TRENDING_CACHE_KEY, posts, settings.TRENDING_CACHE_TIMEOUT)
+    return posts
+
+
+def invalidate_trending(post_ids=(), author_id=None):
+    """Убирает из закэшированного списка посты post_ids и посты автора.
+
+    Остальной список остается в кэше до следующего refresh_trending.
+    """
+    posts = cache.get(TRENDING_CACHE_KEY)
+    if posts is None:
+        return
+    post_ids = set(post_ids)
+    kept = [post for post in posts
+            if post.pk not in post_ids and post.author_id != author_id]
+    if len(kept) != len(posts):
+        cache.set(TRENDING_CACHE_KEY, kept, settings.TRENDING_CACHE_TIMEOUT)
+
+
+def get_trending_posts():
+    """Список из кэша; пока команда его не заполнила, читается из БД."""
+    posts = cache.get(TRENDING_CACHE_KEY)
+    if posts is None:
+        posts = get_top_posts()
+    return posts
+
+
+def prune_scores():
+    """Удаляет рейтинги постов, обсуждение которых вышло за окно."""
+    deleted, _ = PostScore.objects.filter(
+        rank__lt=get_min_rank(timezone.now())
+    ).delete()
+    return deleted
@@ -5,15 +5,55 @@ from . import views
 app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.trending, name='trending'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('fragments/', views.index_fragment, name='index_fragment'),
+    path('fragments/group/<slug:slug>/',
+         views.group_fragment,
+         name='group_fragment'),
+    path('fragments/profile/<str:username>/',
+         views.profile_fragment,
+         name='profile_fragment'),
+    path('fragments/follow/',
+         views.follow_fragment,
+         name='follow_fragment'),
+    path('group/<slug:slug>/archive/<int:year>/<int:month>/',
+         views.group_archive,
+         name='group_archive'),
+    path('autocomplete/', views.autocomplete, name='autocomplete'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/archive/<int:year>/<int:month>/',
+         views.profile_archive,
+         name='profile_archive'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/<int:comment_id>/',
+         views.comment_thread,
+         name='comment_thread'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path('posts/<int:post_id>/unlike/',
+         views.post_unlike,
+         name='post_unlike'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/notifications/',
+         views.notification_settings,
+         name='notification_settings'),
+    path('export/', views.export_data, name='export_data'),
+    path('analytics/', views.analytics_dashboard, name='analytics'),
+    path('analytics/group/<slug:slug>/',
+         views.group_analytics,
+         name='group_analytics'),
+    path('analytics/author/<str:username>/',
+         views.author_analytics,
+         name='author_analytics'),
+    path('export/<int:export_id>/',
+         views.export_download,
+         name='export_download'),
     path('profile/<str:username>/follow/',
          views.profile_follow,
          name='profile_follow'),
@@ -1,23 +1,88 @@
+import os
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, render, redirect
-from django.views.decorators.cache import cache_page
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_POST
+
+from core.decorators import accept_image_uploads, cache_response
+from core.files import serve_file
+
+from . import analytics, archive, export
+from .autocomplete import autocomplete as autocomplete_index
+from .feeds import get_posts
+from .forms import CommentForm, NotificationSettingsForm, PostForm
+from .likes import get_likes_count, like_post, unlike_post
+from .models import (Comment, DataExport, Group, NotificationSettings, Post,
+                     Tag, User)
+from .paginator import (CachedCountPaginator, get_cached_count,
+                        get_count_key, get_keyset_page, invalidate_counts)
+from .tags import normalize_tag, sync_tags
+from .thumbnails import prefetch_thumbnails
+from .trending import get_trending_posts
+
+
+def get_page_obj(posts, page_number, count_key=None):
+    paginator = CachedCountPaginator(posts.values_list('pk', flat=True),
+                                     settings.POSTS_LIMIT,
+                                     count_key=count_key)
+    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = get_posts(page_obj.object_list)
+    prefetch_thumbnails(post.image for post in page_obj)
+    return page_obj
+
 
-from .forms import PostForm, CommentForm
-from .models import Group, Post, User
+def format_feed_cursor(pub_date, pk):
+    return f'{pub_date.isoformat()}_{pk}'
 
 
-def get_page_obj(posts, page_number):
-    paginator = Paginator(posts, settings.POSTS_LIMIT)
-    return paginator.get_page(page_number)
+def parse_feed_cursor(value):
+    """Курсор ленты 'дата_pk' или 404, если он испорчен."""
+    pub_date, _, pk = value.rpartition('_')
+    try:
+        pub_date = parse_datetime(pub_date)
+    except ValueError:
+        pub_date = None
+    if pub_date is None or not pk.isdecimal():
+        raise Http404
+    return pub_date, int(pk)
 
 
-@cache_page(20, key_prefix='index_page')
+def get_fragment(request, posts, feed_view):
+    """Следующая пачка карточек ленты и курсор для ее продолжения.
+
+    Лента листается по убыванию (pub_date, pk) от курсора before, поэтому
+    запрос не зависит от глубины прокрутки, а посты с одной датой не
+    теряются. Ответ без base.html и пагинатора кэшируется отдельно от
+    страниц.
+    """
+    before = request.GET.get('before')
+    if before is not None:
+        before = parse_feed_cursor(before)
+    items, next_cursor = get_keyset_page(posts.only('pk', 'pub_date'),
+                                         ('-pub_date', '-pk'), before,
+                                         settings.POSTS_LIMIT)
+    posts = get_posts([post.pk for post in items])
+    prefetch_thumbnails(post.image for post in posts)
+    html = render_to_string('posts/includes/post_list.html',
+                            {'posts': posts, 'feed_view': feed_view},
+                            request)
+    return JsonResponse({
+        'html': html,
+        'next_cursor': next_cursor and format_feed_cursor(*next_cursor),
+    })
+
+
+@cache_response(20, key_prefix='index_page')
 def index(request):
-    posts = Post.objects.select_related('author', 'group')
+    posts = Post.objects.visible()
     page_number = request.GET.get('page')
-    page_obj = get_page_obj(posts, page_number)
+    page_obj = get_page_obj(posts, page_number, get_count_key('index'))
     context = {
         'title': 'Последние обновления на сайте',
         'page_obj': page_obj,
@@ -25,11 +90,27 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@cache_response(20, key_prefix='index_fragment')
+def index_fragment(request):
+    return get_fragment(request, Post.objects.visible(), 'posts:index')
+
+
+def trending(request):
+    posts = get_trending_posts()
+    prefetch_thumbnails(post.image for post in posts)
+    context = {
+        'title': 'Популярное сейчас',
+        'posts': posts,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author')
+    group = get_object_or_404(Group, slug=slug, is_deleted=False)
+    posts = group.posts.visible()
     page_number = request.GET.get('page')
-    page_obj = get_page_obj(posts, page_number)
+    page_obj = get_page_obj(posts, page_number,
+                            get_count_key('group', group.pk))
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -37,42 +118,170 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_response(20, key_prefix='group_fragment')
+def group_fragment(request, slug):
+    group = get_object_or_404(Group, slug=slug, is_deleted=False)
+    return get_fragment(request, group.posts.visible(), 'posts:group_list')
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group')
+    author = get_object_or_404(User, username=username,
+                               deletion__isnull=True)
+    posts = author.posts.visible()
     page_number = request.GET.get('page')
-    page_obj = get_page_obj(posts, page_number)
+    page_obj = get_page_obj(posts, page_number,
+                            get_count_key('author', author.pk))
     context = {
         'page_obj': page_obj,
-        'posts_number': posts.count(),
+        'posts_number': page_obj.paginator.count,
         'author': author,
     }
     if request.user.is_authenticated:
         context['following'] = (request.user.follower.filter(author=author)
                                 .exists())
+    if request.user == author:
+        context['scheduled'] = author.posts.scheduled().order_by('publish_at')
     return render(request, 'posts/profile.html', context)
 
 
-def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.select_related('author')
-    form = CommentForm()
+@cache_response(20, key_prefix='profile_fragment')
+def profile_fragment(request, username):
+    author = get_object_or_404(User, username=username,
+                               deletion__isnull=True)
+    return get_fragment(request, author.posts.visible(), 'posts:profile')
+
+
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=normalize_tag(name))
+    before = request.GET.get('before')
+    if before is not None and not before.isdecimal():
+        raise Http404
+    links, next_post = get_keyset_page(
+        tag.post_tags.filter(post__is_deleted=False, post__is_hidden=False,
+                             post__is_published=True,
+                             post__author__deletion__isnull=True)
+        .only('post_id'),
+        '-post_id',
+        before,
+        settings.POSTS_LIMIT,
+    )
+    posts = get_posts([link.post_id for link in links])
+    prefetch_thumbnails(post.image for post in posts)
+    context = {
+        'tag': tag,
+        'posts': posts,
+        'next_post': next_post,
+    }
+    return render(request, 'posts/tag.html', context)
+
+
+def autocomplete(request):
+    results = autocomplete_index.search(request.GET.get('q', ''))
+    return JsonResponse({'results': results})
+
+
+def serve_archive(request, kind, key, year, month):
+    if not archive.is_valid_page(kind, key, year, month):
+        raise Http404
+    path = archive.get_archive_path(kind, key, year, month)
+    anonymous = not request.user.is_authenticated
+    frozen = archive.is_frozen(year, month)
+    if anonymous and frozen and not os.path.exists(path):
+        path = archive.build_archive_page(kind, key, year, month)
+        if path is None:
+            raise Http404
+    if anonymous and frozen:
+        return serve_file(request, path, 'text/html; charset=utf-8')
+    try:
+        content = archive.render_archive_page(kind, key, year, month,
+                                              request=request)
+    except (Group.DoesNotExist, User.DoesNotExist, Post.DoesNotExist):
+        raise Http404
+    return HttpResponse(content)
+
+
+def group_archive(request, slug, year, month):
+    return serve_archive(request, 'group', slug, year, month)
+
+
+def profile_archive(request, username, year, month):
+    return serve_archive(request, 'profile', username, year, month)
+
+
+def render_post_detail(request, post, comments, next_comment=None):
+    reply_to = request.GET.get('reply')
+    if reply_to and reply_to.isdigit():
+        reply_to = post.comments.filter(pk=reply_to).first()
+    else:
+        reply_to = None
+    form = CommentForm(initial={'parent': reply_to})
     context = {
         'post': post,
+        'posts_number': get_cached_count(
+            get_count_key('author', post.author_id),
+            post.author.posts.visible()
+        ),
+        'likes_count': get_likes_count(post),
+        'liked': (request.user.is_authenticated
+                  and post.likes.filter(user=request.user).exists()),
         'comments': comments,
+        'next_comment': next_comment,
+        'reply_to': reply_to,
         'form': form,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def get_visible_post(post_id):
+    posts = get_posts([post_id])
+    if not posts or not posts[0].is_visible:
+        raise Http404
+    return posts[0]
+
+
+@cache_response(30, key_prefix='post_detail')
+def post_detail(request, post_id):
+    post = get_visible_post(post_id)
+    comments, next_comment = get_keyset_page(
+        post.comments.select_related('author'),
+        'path',
+        request.GET.get('after'),
+        settings.COMMENTS_LIMIT,
+    )
+    return render_post_detail(request, post, comments, next_comment)
+
+
+def comment_thread(request, post_id, comment_id):
+    post = get_visible_post(post_id)
+    comment = get_object_or_404(post.comments, pk=comment_id)
+    comments, next_comment = get_keyset_page(
+        Comment.objects.subtree(comment).select_related('author'),
+        'path',
+        request.GET.get('after'),
+        settings.COMMENTS_LIMIT,
+    )
+    return render_post_detail(request, post, comments, next_comment)
+
+
+def get_post_form(request, **kwargs):
+    form = PostForm(request.POST or None,
+                    files=request.FILES or None,
+                    **kwargs)
+    upload_error = getattr(request, 'upload_error', None)
+    if upload_error:
+        form.add_error('image', upload_error)
+    return form
+
+
 @login_required
+@accept_image_uploads
 def post_create(request):
-    form = PostForm(request.POST or None,
-                    files=request.FILES or None)
+    form = get_post_form(request)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        sync_tags(post)
         return redirect('posts:profile', request.user)
     context = {
         'form': form,
@@ -81,15 +290,19 @@ def post_create(request):
 
 
 @login_required
+@accept_image_uploads
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.visible() | Post.objects.scheduled(), pk=post_id
+    )
     if request.user != post.author:
         return redirect('posts:post_detail', post.pk)
-    form = PostForm(request.POST or None,
-                    files=request.FILES or None,
-                    instance=post)
+    form = get_post_form(request, instance=post)
     if form.is_valid():
-        form.save()
+        post = form.save()
+        sync_tags(post)
+        if not post.is_published:
+            return redirect('posts:profile', request.user)
         return redirect('posts:post_detail', post.pk)
     context = {
         'form': form,
@@ -100,8 +313,8 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm(request.POST or None)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    form = CommentForm(request.POST or None, post=post)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -110,20 +323,49 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@login_required
+@require_POST
+def post_like(request, post_id):
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    like_post(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    unlike_post(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = Post.objects.visible().filter(
+        author__following__user=request.user
+    )
     page_number = request.GET.get('page')
-    page_obj = get_page_obj(posts, page_number)
+    page_obj = get_page_obj(posts, page_number,
+                            get_count_key('follow', request.user.pk))
     context = {'page_obj': page_obj}
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def follow_fragment(request):
+    posts = Post.objects.visible().filter(
+        author__following__user=request.user
+    )
+    return get_fragment(request, posts, 'posts:follow_index')
+
+
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username,
+                               deletion__isnull=True)
     if author != request.user:
         author.following.get_or_create(user=request.user)
+        invalidate_counts(get_count_key('follow', request.user.pk))
     return redirect('posts:profile', username=username)
 
 
@@ -131,4 +373,101 @@ def profile_follow(request, username):
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     author.following.filter(user=request.user).delete()
+    invalidate_counts(get_count_key('follow', request.user.pk))
     return redirect('posts:profile', username=username)
+
+
+@login_required
+def notification_settings(request):
+    instance = (NotificationSettings.objects.filter(user=request.user).first()
+                or NotificationSettings(user=request.user))
+    form = NotificationSettingsForm(request.POST or None, instance=instance)
+    if form.is_valid():
+        form.save()
+        return redirect('posts:notification_settings')
+    return render(request, 'posts/notification_settings.html',
+                  {'form': form})
+
+
+@login_required
+def export_data(request):
+    if (request.method == 'POST'
+            and export.get_export_size(request.user)
+            <= settings.EXPORT_STREAM_LIMIT):
+        response = StreamingHttpResponse(export.iter_export(request.user),
+                                         content_type='application/zip')
+        response['Content-Disposition'] = (
+            f'attachment; filename="yatube-{request.user.username}.zip"'
+        )
+        return response
+    if request.method == 'POST':
+        request.user.exports.get_or_create(status=DataExport.PENDING)
+        return redirect('posts:export_data')
+    context = {
+        'exports': request.user.exports.all(),
+        'size': export.get_export_size(request.user),
+    }
+    return render(request, 'posts/export.html', context)
+
+
+@login_required
+def export_download(request, export_id):
+    data_export = get_object_or_404(request.user.exports,
+                                    pk=export_id,
+                                    status=DataExport.READY)
+    if not os.path.exists(data_export.path):
+        raise Http404
+    response = serve_file(request, data_export.path, 'application/zip',
+                          cache_control='private, no-cache')
+    response['Content-Disposition'] = (
+        f'attachment; filename="yatube-{request.user.username}.zip"'
+    )
+    return response
+
+
+def get_analytics_days(request):
+    days = request.GET.get('days', '')
+    if days.isdigit() and int(days) in settings.ANALYTICS_PERIODS:
+        return int(days)
+    return settings.ANALYTICS_PERIODS[1]
+
+
+@staff_member_required
+def analytics_dashboard(request):
+    days = get_analytics_days(request)
+    context = {
+        'days': days,
+        'periods': settings.ANALYTICS_PERIODS,
+        'groups': analytics.get_top_groups(days,
+                                           settings.ANALYTICS_TOP_LIMIT),
+        'authors': analytics.get_top_authors(days,
+                                             settings.ANALYTICS_TOP_LIMIT),
+    }
+    return render(request, 'posts/analytics.html', context)
+
+
+@staff_member_required
+def group_analytics(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    days = get_analytics_days(request)
+    context = {
+        'title': f'Статистика группы {group}',
+        'days': days,
+        'periods': settings.ANALYTICS_PERIODS,
+        'stats': analytics.get_daily_stats(group.daily_stats, days),
+    }
+    return render(request, 'posts/analytics_detail.html', context)
+
+
+@staff_member_required
+def author_analytics(request, username):
+    author = get_object_or_404(User, username=username)
+    days = get_analytics_days(request)
+    context = {
+        'title': f'Статистика автора {author.get_full_name() or author}',
+        'days': days,
+        'periods': settings.ANALYTICS_PERIODS,
+        'stats': analytics.get_daily_stats(author.daily_stats, days),
+        'show_followers': True,
+    }
+    return render(request, 'posts/analytics_detail.html', context)
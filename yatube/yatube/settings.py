@@ -11,25 +11,50 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
+def get_env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_env_list(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'l$u-5%on0@bs*9udz=(rrgo!c%49o$*(w=-n*^qv!qmdcp=(+7'
-
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Production profile: YATUBE_DEBUG=0
+DEBUG = get_env_bool('YATUBE_DEBUG', True)
 
-ALLOWED_HOSTS = [
+# SECURITY WARNING: keep the secret key used in production secret!
+# The development key is only used with DEBUG on.
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY')
+if not SECRET_KEY:
+    if not DEBUG:
+        raise ImproperlyConfigured(
+            'Set YATUBE_SECRET_KEY when YATUBE_DEBUG is off.'
+        )
+    SECRET_KEY = 'l$u-5%on0@bs*9udz=(rrgo!c%49o$*(w=-n*^qv!qmdcp=(+7'
+
+ALLOWED_HOSTS = get_env_list('YATUBE_ALLOWED_HOSTS', [
     '127.0.0.1',
     'www.kraleksey.pythonanywhere.com',
     'kraleksey.pythonanywhere.com',
-]
+])
 
 INTERNAL_IPS = [
     '127.0.0.1',
@@ -48,7 +73,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
@@ -56,12 +80,16 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.DegradedModeMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIRS = os.path.join(BASE_DIR, 'templates')
@@ -82,6 +110,18 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.template.context_processors.debug'
+    )
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -91,7 +131,10 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get('YATUBE_DB_NAME',
+                               os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_CONN_MAX_AGE',
+                                           0 if DEBUG else 600)),
     }
 }
 
@@ -114,11 +157,36 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+THUMBNAIL_KVSTORE = 'posts.thumbnails.PrefetchingKVStore'
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+    # Общие счетчики core.metrics для всех процессов и команд включаются
+    # переменной YATUBE_METRICS_DIR. В продакшене лучше указать здесь кэш
+    # с атомарным incr, например Memcached.
+    'metrics': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'YATUBE_METRICS_DIR',
+            os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+        ),
+        'TIMEOUT': None,
+    },
 }
+# Без YATUBE_METRICS_DIR, в том числе в тестах, счетчики живут в
+# локальном кэше процесса.
+METRICS_CACHE = 'metrics' if 'YATUBE_METRICS_DIR' in os.environ else 'default'
+METRICS_FLUSH_INTERVAL = 10
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+OBJECT_CACHE_TIMEOUT = 60 * 60
+USER_CACHE_TIMEOUT = 5 * 60
+PAGE_CACHE_STALE_TIMEOUT = 5 * 60
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_LOCK_WAIT = 5
+PAGE_CACHE_POLL_INTERVAL = 0.05
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
@@ -143,11 +211,67 @@ STATICFILES_DIRS = [
     'yatube/static',
     'about/static',
 ]
+STATIC_CACHE_CONTROL = 'public, max-age=3600'
+STATIC_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+UPLOAD_MAX_REQUEST_SIZE = 10 * 1024 * 1024
+UPLOAD_SNIFF_SIZE = 4 * 1024
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
+MEDIA_THUMBNAIL_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# None, 'x-accel-redirect' (nginx) или 'x-sendfile' (Apache, lighttpd)
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
 
 # Project constants
 POSTS_LIMIT = 10
+POSTS_COUNT_CACHE_TIMEOUT = 5 * 60
+COMMENTS_LIMIT = 50
+LIKE_COUNTER_SHARDS = 8
+NOTIFICATIONS_KEEP_DAYS = 30
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+EXPORT_CHUNK_SIZE = 500
+EXPORT_STREAM_LIMIT = 1000
+EXPORT_KEEP_DAYS = 7
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_REBUILD_INTERVAL = 10 * 60
+ANALYTICS_PERIODS = (7, 30, 90)
+ANALYTICS_TOP_LIMIT = 20
+DEGRADED_DURATION = 30
+DEGRADED_RETRY_AFTER = 30
+DEGRADED_REFRESH_INTERVAL = 60
+DEGRADED_CACHE_TIMEOUT = 24 * 60 * 60
+# Файл с флагом режима, общий для всех процессов и команды degraded_mode
+DEGRADED_STATE_FILE = os.environ.get(
+    'YATUBE_DEGRADED_STATE_FILE',
+    os.path.join(tempfile.gettempdir(), 'yatube-degraded.json')
+)
+# Представления, которые меняют данные по GET; в режиме они получают 503
+DEGRADED_WRITE_VIEWS = (
+    'posts:profile_follow',
+    'posts:profile_unfollow',
+)
+DEGRADED_READ_VIEWS = (
+    'posts:index',
+    'posts:index_fragment',
+    'posts:trending',
+    'posts:group_list',
+    'posts:group_fragment',
+    'posts:profile',
+    'posts:profile_fragment',
+    'posts:post_detail',
+    'posts:tag_posts',
+    'about:author',
+    'about:tech',
+)
+TRENDING_LIMIT = 10
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_WINDOW = 48 * 60 * 60
+TRENDING_CACHE_TIMEOUT = 5 * 60
+ARCHIVE_ROOT = os.path.join(BASE_DIR, 'archive')
+ARCHIVE_FREEZE_DAYS = 90
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -0,0 +1,57 @@
+// Догружает ленту пачками из fragment-эндпоинтов. Без JS остается
+// обычный постраничный переход.
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('[data-load-more]').forEach(function (button) {
+    var feed = document.getElementById(button.dataset.feed);
+    var pagination = document.querySelector('[data-pagination]');
+    if (!feed || !window.fetch) {
+      return;
+    }
+    if (pagination) {
+      pagination.hidden = true;
+    }
+    button.hidden = false;
+
+    function loadMore() {
+      if (button.disabled) {
+        return;
+      }
+      button.disabled = true;
+      fetch(button.dataset.url + '?before=' +
+            encodeURIComponent(button.dataset.cursor), {
+        credentials: 'same-origin',
+        headers: {'Accept': 'application/json'}
+      })
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error(response.statusText);
+          }
+          return response.json();
+        })
+        .then(function (data) {
+          feed.insertAdjacentHTML('beforeend', data.html);
+          if (data.next_cursor) {
+            button.dataset.cursor = data.next_cursor;
+            button.disabled = false;
+          } else {
+            button.remove();
+          }
+        })
+        .catch(function () {
+          button.disabled = false;
+          if (pagination) {
+            pagination.hidden = false;
+          }
+        });
+    }
+
+    button.addEventListener('click', loadMore);
+    if ('IntersectionObserver' in window) {
+      new IntersectionObserver(function (entries) {
+        if (entries[0].isIntersecting) {
+          loadMore();
+        }
+      }, {rootMargin: '400px'}).observe(button);
+    }
+  });
+});
@@ -1,24 +1,30 @@
-import debug_toolbar
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from core.views import serve_media, serve_static
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
-    path('auth/', include('django.contrib.auth.urls'))
+    path('auth/', include('django.contrib.auth.urls')),
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'),
+            serve_media, name='media'),
 ]
 
 handler403 = 'core.views.permission_denied'
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
+if not settings.DEBUG:
+    urlpatterns += (
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'),
+                serve_static, name='static'),
     )
+
+if settings.DEBUG and 'debug_toolbar' in settings.INSTALLED_APPS:
+    import debug_toolbar
+
     urlpatterns += (path('__debug/__', include(debug_toolbar.urls)),)